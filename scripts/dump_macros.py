@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# This script is part of the xlrd2 package, which is released under a
+# BSD-style licence.
+"""
+Print the formulas of every macro sheet (XLM) in a workbook.
+
+usage: dump_macros.py [--mode {formula_map,rows,used_cells}] [--jobs N] path
+"""
+
+import argparse
+import io
+import mmap
+import multiprocessing
+import sys
+from itertools import islice
+
+import xlrd2
+from xlrd2.biffh import XL_MACROSHEET
+
+CHUNK_LINES = 10000
+
+
+def write_lines(lines, outfile=None):
+    """
+    Write an iterable of lines with one ``write()`` per ``CHUNK_LINES`` lines,
+    rather than one ``print()`` per line.
+    """
+    outfile = outfile or sys.stdout
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, CHUNK_LINES))
+        if not chunk:
+            break
+        chunk.append('')
+        outfile.write('\n'.join(chunk))
+
+
+def dump_via_formula_map(sheet, outfile=None):
+    "Visit only the formula cells, via ``sheet.iter_formula_cells()``."
+    outfile = outfile or sys.stdout
+    write_lines((
+        f"({rowx},{colx}):\t{formula},\t{value}"
+        for rowx, colx, formula, value in sheet.iter_formula_cells()
+    ), outfile)
+
+
+def dump_via_rows(sheet, outfile=None):
+    "Visit every cell of every row."
+    outfile = outfile or sys.stdout
+    write_lines((
+        f"({cell.row},{cell.column}):\t{cell.formula},\t{cell.value}"
+        for row in sheet.get_rows() if row is not None
+        for cell in row
+        if cell.formula
+    ), outfile)
+
+
+def dump_via_used_cells(sheet, outfile=None):
+    "Visit the cells returned by ``sheet.get_used_cells()``, in row-major order."
+    outfile = outfile or sys.stdout
+    cells = sorted(
+        (cell for cell in sheet.get_used_cells() if cell.formula),
+        key=lambda cell: (cell.row, cell.column))
+    write_lines((
+        f"({cell.row},{cell.column}):\t{cell.formula},\t{cell.value}"
+        for cell in cells
+    ), outfile)
+
+
+DUMPERS = {
+    'formula_map': dump_via_formula_map,
+    'rows': dump_via_rows,
+    'used_cells': dump_via_used_cells,
+}
+
+
+def _open_workbook(path, file_contents):
+    return xlrd2.open_workbook(
+        path, file_contents=file_contents, formatting_info=True,
+        on_demand=True)
+
+
+def _dump_sheet(xl_workbook, sheetx, dump_sheet, outfile):
+    # The sheet type is only known once the sheet's BOF has been read,
+    # so each sheet is loaded, dumped if it is a macro sheet, and released.
+    sheet = xl_workbook.sheet_by_index(sheetx)
+    if sheet.boundsheet_type == XL_MACROSHEET:
+        print(sheet.name, file=outfile)
+        dump_sheet(sheet, outfile)
+    xl_workbook.unload_sheet(sheetx)
+
+
+def _dump_sheet_job(args):
+    # Runs in a worker process: open the workbook independently and
+    # return the dump of a single sheet as text.
+    path, mode, sheetx = args
+    outfile = io.StringIO()
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_contents:
+        xl_workbook = _open_workbook(path, file_contents)
+        _dump_sheet(xl_workbook, sheetx, DUMPERS[mode], outfile)
+    return outfile.getvalue()
+
+
+def dump_macros(path, mode='formula_map', outfile=None, jobs=1):
+    outfile = outfile or sys.stdout
+    dump_sheet = DUMPERS[mode]
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_contents:
+        xl_workbook = _open_workbook(path, file_contents)
+        if jobs <= 1:
+            for sheetx in range(xl_workbook.nsheets):
+                _dump_sheet(xl_workbook, sheetx, dump_sheet, outfile)
+            return
+        nsheets = xl_workbook.nsheets
+    job_args = [(path, mode, sheetx) for sheetx in range(nsheets)]
+    with multiprocessing.Pool(jobs) as pool:
+        # imap keeps the output in sheet order
+        for text in pool.imap(_dump_sheet_job, job_args):
+            outfile.write(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Print the formulas of every macro sheet in a workbook.")
+    parser.add_argument('--mode', choices=sorted(DUMPERS), default='formula_map',
+                        help="cell enumeration strategy (default: %(default)s)")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="number of worker processes, one sheet per task "
+                             "(default: %(default)s)")
+    parser.add_argument('path', help="path to the workbook")
+    args = parser.parse_args(argv)
+    if isinstance(sys.stdout, io.TextIOWrapper):
+        # Don't flush on every newline when writing to a terminal.
+        sys.stdout.reconfigure(line_buffering=False)
+    dump_macros(args.path, args.mode, jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    main()
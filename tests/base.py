@@ -1,5 +1,7 @@
 import os
 
+__all__ = ('from_this_dir',)
+
 
 def from_this_dir(filename):
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
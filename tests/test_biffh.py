@@ -1,8 +1,11 @@
 import sys
 import unittest
 
+import xlrd2
 from xlrd2 import biffh
 
+from .base import from_this_dir
+
 if sys.version_info[0] >= 3:
     from io import StringIO
 else:
@@ -19,5 +22,18 @@ class TestHexDump(unittest.TestCase):
         assert "61 62 63 00 65 01" in s, s
         assert "abc~e?" in s, s
 
+class TestDump(unittest.TestCase):
+    def test_book_dump(self):
+        book = xlrd2.open_workbook(from_this_dir('profiles.xls'))
+        sio = StringIO()
+        book.dump(sio)
+        self.assertIn("nsheets: 5", sio.getvalue())
+
+    def test_name_dump(self):
+        book = xlrd2.open_workbook(from_this_dir('formula_test_names.xls'))
+        sio = StringIO()
+        book.name_obj_list[0].dump(sio)
+        self.assertIn("name: 'binopbool'", sio.getvalue())
+
 if __name__=='__main__':
     unittest.main()
@@ -0,0 +1,49 @@
+import io
+import os
+import sys
+from unittest import TestCase
+
+import xlrd2
+
+from .base import from_this_dir
+
+# scripts/ is not a package; put it on sys.path so that worker processes
+# can import dump_macros as well.
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+import dump_macros  # noqa: E402
+
+# formula_test_sjmachin.xls with Sheet1 relabelled as a macro sheet
+MACRO_SHEET_XLS = from_this_dir('macro_sheet.xls')
+
+
+class TestDumpMacros(TestCase):
+
+    def dump(self, mode, jobs):
+        outfile = io.StringIO()
+        dump_macros.dump_macros(MACRO_SHEET_XLS, mode, outfile, jobs)
+        return outfile.getvalue()
+
+    def test_modes_and_jobs_agree(self):
+        expected = self.dump('formula_map', 1)
+        self.assertEqual(expected.splitlines()[:2],
+                         ['Sheet1', '(2,1):\t1.0/7.0,\t0.14285714285714285'])
+        self.assertEqual(len(expected.splitlines()), 7)
+        for mode in sorted(dump_macros.DUMPERS):
+            for jobs in (1, 2):
+                self.assertEqual(self.dump(mode, jobs), expected,
+                                 msg="mode=%s jobs=%d" % (mode, jobs))
+
+    def test_modes_agree_after_overwrite(self):
+        book = xlrd2.open_workbook(MACRO_SHEET_XLS, formatting_info=True)
+        sheet = book.sheet_by_index(0)
+        sheet.put_cell(3, 1, xlrd2.XL_CELL_NUMBER, 5.0, 0)
+        outputs = {}
+        for mode, dump_sheet in dump_macros.DUMPERS.items():
+            outfile = io.StringIO()
+            dump_sheet(sheet, outfile)
+            outputs[mode] = outfile.getvalue()
+        self.assertNotIn('(3,1)', outputs['formula_map'])
+        self.assertEqual(len(outputs['formula_map'].splitlines()), 5)
+        for mode, text in outputs.items():
+            self.assertEqual(text, outputs['formula_map'], msg="mode=%s" % mode)
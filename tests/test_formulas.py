@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 # Portions Copyright (C) 2010, Manfred Moitzi under a BSD licence
 
+import copy
+import pickle
+import struct
 from unittest import TestCase
 
 import xlrd2
@@ -53,6 +56,30 @@ class TestFormulas(TestCase):
             r"'\u041c\u041e\u0421\u041a\u0412\u0410 \u041c\u043e\u0441\u043a\u0432\u0430'",
         )
 
+    def test_iter_formula_cells(self):
+        cells = list(self.sheet.iter_formula_cells())
+        self.assertEqual(
+            [(rowx, colx, formula) for rowx, colx, formula, value in cells],
+            [
+                (2, 1, '1.0/7.0'),
+                (3, 1, '"ABC"&"DEF"'),
+                (4, 1, 'REPT("foo",0.0)'),
+                (5, 1, '2.0>1.0'),
+                (6, 1, '1.0/0.0'),
+                (7, 1, 'B2'),
+            ],
+        )
+        self.assertEqual(cells[1][3], 'ABCDEF')
+        self.assertEqual(self.sheet.formula_map[(7, 1)], 'B2')
+
+    def test_overwritten_formula_cell(self):
+        self.sheet.put_cell(2, 1, xlrd2.XL_CELL_NUMBER, 5.0, None)
+        self.assertNotIn((2, 1), self.sheet.formula_map)
+        cells = [(rowx, colx) for rowx, colx, formula, value
+                 in self.sheet.iter_formula_cells()]
+        self.assertNotIn((2, 1), cells)
+        self.assertEqual(len(cells), 5)
+
 class TestNameFormulas(TestCase):
 
     def setUp(self):
@@ -79,3 +106,90 @@ class TestNameFormulas(TestCase):
 
     def test_choose(self):
         self.assertEqual(self.get_value(1, 6), "'C'")
+
+class TestSharedNameFormulas(TestCase):
+
+    def test_results_not_shared(self):
+        # each sheet's Print_Area name has the same formula bytes
+        book = xlrd2.open_workbook(from_this_dir('issue20.xls'))
+        names = book.name_map['print_area']
+        self.assertEqual(len(names), 3)
+        first, second = names[0], names[1]
+        self.assertEqual(first.raw_formula, second.raw_formula)
+        self.assertIsNot(first.result, second.result)
+        self.assertIsNot(first.stack[0], second.stack[0])
+        first.result.text = 'changed'
+        self.assertEqual(second.result.text, '"#REF!"')
+
+    def test_referenced_name_not_shared(self):
+        # two names whose formulas differ only in the tName token class
+        # both refer to a third name; the second hits the tName cache
+        book = xlrd2.open_workbook(from_this_dir('formula_test_names.xls'))
+        template = book.name_obj_list[0]
+        formulas = [
+            ('target', b'\x1f' + struct.pack('<d', 2.0)),
+            ('ref_class', b'\x23' + struct.pack('<HH', len(book.name_obj_list) + 1, 0)),
+            ('value_class', b'\x43' + struct.pack('<HH', len(book.name_obj_list) + 1, 0)),
+        ]
+        names = []
+        for name, raw_formula in formulas:
+            nobj = copy.copy(template)
+            nobj.name = name
+            nobj.scope = -1
+            nobj.macro = nobj.binary = nobj.evaluated = 0
+            nobj.raw_formula = raw_formula
+            nobj.basic_formula_len = len(raw_formula)
+            book.name_obj_list.append(nobj)
+            names.append(nobj)
+        target, first, second = names
+        for nobj in names:
+            namex = book.name_obj_list.index(nobj)
+            xlrd2.formula.evaluate_name_formula(book, nobj, namex)
+        self.assertIn(book.name_obj_list.index(target),
+                      book._name_operand_cache)
+        for nobj in (first, second):
+            self.assertEqual(nobj.result.kind, xlrd2.formula.oNUM)
+            self.assertEqual(nobj.result.value, 2.0)
+            self.assertEqual(nobj.result.text, 'target')
+        self.assertIsNot(first.result, second.result)
+
+class TestColname(TestCase):
+
+    def test_colname(self):
+        self.assertEqual(
+            [xlrd2.colname(colx) for colx in (0, 25, 26, 701, 702, 16383)],
+            ['A', 'Z', 'AA', 'ZZ', 'AAA', 'XFD'],
+        )
+
+class TestRef3D(TestCase):
+
+    def test_separate_relflags(self):
+        coords = (0, 1, 2, 3, 4, 5)
+        relflags = (0, 0, 1, 1, 0, 0)
+        ref3d = xlrd2.Ref3D(coords, relflags)
+        self.assertEqual(ref3d, xlrd2.Ref3D(coords + relflags))
+        self.assertEqual(ref3d.coords, coords)
+        self.assertEqual(ref3d.relflags, relflags)
+
+    def test_tuple_compatibility(self):
+        coords = (0, 1, 2, 3, 4, 5)
+        relflags = (0, 0, 1, 1, 0, 0)
+        ref3d = xlrd2.Ref3D(coords, relflags)
+        self.assertEqual(len(ref3d), 12)
+        self.assertEqual(ref3d[0], 0)
+        self.assertEqual(ref3d[6:], relflags)
+        self.assertEqual(tuple(ref3d), coords + relflags)
+        self.assertEqual(ref3d, coords + relflags)
+        self.assertEqual(hash(ref3d), hash(coords + relflags))
+        shtxlo, shtxhi = ref3d[:2]
+        self.assertEqual((shtxlo, shtxhi), (0, 1))
+
+    def test_pickle_round_trip(self):
+        ref3d = xlrd2.Ref3D((0, 1, 2, 3, 4, 5), (0, 0, 1, 1, 0, 0))
+        opnd = xlrd2.formula.Operand(xlrd2.formula.oREL, [ref3d], 0, 'A1')
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(opnd, protocol))
+            self.assertEqual(copy.kind, opnd.kind)
+            self.assertEqual(copy.text, 'A1')
+            self.assertEqual(copy.value, [ref3d])
+            self.assertEqual(copy.value[0].relflags, ref3d.relflags)
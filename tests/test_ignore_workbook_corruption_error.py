@@ -1,15 +1,23 @@
+import re
 from unittest import TestCase
 
 import xlrd2
 
 from .base import from_this_dir
 
+_CORRUPTION_RE = re.compile(r"Workbook corruption")
+
 
 class TestIgnoreWorkbookCorruption(TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        with open(from_this_dir('corrupted_error.xls'), 'rb') as f:
+            cls.raw = f.read()
+
     def test_not_corrupted(self):
         with self.assertRaises(Exception) as context:
-            xlrd2.open_workbook(from_this_dir('corrupted_error.xls'))
-        self.assertTrue('Workbook corruption' in str(context.exception))
+            xlrd2.open_workbook(file_contents=self.raw)
+        self.assertRegex(str(context.exception), _CORRUPTION_RE)
 
-        xlrd2.open_workbook(from_this_dir('corrupted_error.xls'), ignore_workbook_corruption=True)
+        xlrd2.open_workbook(file_contents=self.raw, ignore_workbook_corruption=True)
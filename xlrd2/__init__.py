@@ -2,7 +2,6 @@
 # This module is part of the xlrd2 package, which is released under a
 # BSD-style licence.
 import os
-import pprint
 import sys
 import zipfile
 
@@ -17,7 +16,6 @@ from .formula import *  # is constrained by __all__
 from .info import __VERSION__, __version__
 from .sheet import empty_cell
 from .xldate import XLDateError, xldate_as_datetime, xldate_as_tuple
-from .xlsx import X12Book
 
 if sys.version.startswith("IronPython"):
     # print >> sys.stderr, "...importing encodings"
@@ -30,6 +28,15 @@ except ImportError:
     MMAP_AVAILABLE = 0
 USE_MMAP = MMAP_AVAILABLE
 
+
+def __getattr__(name):
+    # The xlsx module (and ElementTree with it) is only imported once an
+    # xlsx file is opened; keep ``xlrd2.X12Book`` working regardless.
+    if name == 'X12Book':
+        from .xlsx import X12Book
+        return X12Book
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
 def open_workbook(filename=None,
                   logfile=sys.stdout,
                   verbosity=0,
@@ -120,6 +127,7 @@ def open_workbook(filename=None,
         with open(filename, "rb") as f:
             peek = f.read(peeksz)
     if peek == b"PK\x03\x04": # a ZIP file
+        from . import xlsx
         if file_contents:
             zf = zipfile.ZipFile(timemachine.BYTES_IO(file_contents))
         else:
@@ -128,14 +136,14 @@ def open_workbook(filename=None,
         # Workaround for some third party files that use forward slashes and
         # lower case names. We map the expected name in lowercase to the
         # actual filename in the zip container.
-        component_names = dict([(X12Book.convert_filename(name), name)
+        component_names = dict([(xlsx.X12Book.convert_filename(name), name)
                                 for name in zf.namelist()])
 
         if verbosity:
+            import pprint
             logfile.write('ZIP component_names:\n')
             pprint.pprint(component_names, logfile)
         if 'xl/workbook.xml' in component_names:
-            from . import xlsx
             bk = xlsx.open_workbook_2007_xml(
                 zf,
                 component_names,
@@ -5,7 +5,8 @@
 from __future__ import print_function
 
 import sys
-from struct import unpack
+from struct import Struct, unpack
+from struct import error as struct_error
 
 from .timemachine import *
 
@@ -25,6 +26,9 @@ class BaseObject(object):
     :meth:`dump` method for debugging.
     """
 
+    # Allows subclasses that define __slots__ to really go without __dict__.
+    __slots__ = ()
+
     _repr_these = []
 
 
@@ -37,13 +41,21 @@ class BaseObject(object):
         """
         if f is None:
             f = sys.stderr
-        if hasattr(self, "__slots__"):
-            alist = []
-            for attr in self.__slots__:
-                alist.append((attr, getattr(self, attr)))
-        else:
-            alist = self.__dict__.items()
-        alist = sorted(alist)
+        # Every subclass inherits BaseObject's empty __slots__, so collect
+        # the slots declared along the MRO plus any instance __dict__.
+        adict = dict(getattr(self, "__dict__", ()))
+        for klass in type(self).__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots, )
+            for attr in slots:
+                if attr in ("__dict__", "__weakref__") or attr in adict:
+                    continue
+                try:
+                    adict[attr] = getattr(self, attr)
+                except AttributeError:
+                    pass # slot never assigned
+        alist = sorted(adict.items())
         pad = " " * indent
         if header is not None: print(header, file=f)
         list_type = type([])
@@ -246,30 +258,37 @@ def upkbitsL(tgt_obj, src, manifest, local_setattr=setattr, local_int=int):
     for n, mask, attr in manifest:
         local_setattr(tgt_obj, attr, local_int((src & mask) >> n))
 
+# String length prefix readers, indexed by lenlen (1 or 2 bytes). These and
+# the option-field readers below read in place, so the string helpers
+# only slice the character data itself and accept bytes or a memoryview.
+_unpack_nchars = (None, Struct('<B').unpack_from, Struct('<H').unpack_from)
+_unpack_rt = Struct('<H').unpack_from
+_unpack_sz = Struct('<i').unpack_from
+
 def unpack_string(data, pos, encoding, lenlen=1):
-    nchars = unpack('<' + 'BH'[lenlen-1], data[pos:pos+lenlen])[0]
+    nchars = _unpack_nchars[lenlen](data, pos)[0]
     pos += lenlen
-    return unicode(data[pos:pos+nchars], encoding)
+    return str(data[pos:pos+nchars], encoding)
 
 def unpack_string_update_pos(data, pos, encoding, lenlen=1, known_len=None):
     if known_len is not None:
         # On a NAME record, the length byte is detached from the front of the string.
         nchars = known_len
     else:
-        nchars = unpack('<' + 'BH'[lenlen-1], data[pos:pos+lenlen])[0]
+        nchars = _unpack_nchars[lenlen](data, pos)[0]
         pos += lenlen
     newpos = pos + nchars
-    return (unicode(data[pos:newpos], encoding), newpos)
+    return (str(data[pos:newpos], encoding), newpos)
 
 def unpack_unicode(data, pos, lenlen=2):
     "Return unicode_strg"
-    nchars = unpack('<' + 'BH'[lenlen-1], data[pos:pos+lenlen])[0]
+    nchars = _unpack_nchars[lenlen](data, pos)[0]
     if not nchars:
         # Ambiguous whether 0-length string should have an "options" byte.
         # Avoid crash if missing.
         return UNICODE_LITERAL("")
     pos += lenlen
-    options = BYTES_ORD(data[pos])
+    options = data[pos]
     pos += 1
     # phonetic = options & 0x04
     # richtext = options & 0x08
@@ -283,7 +302,7 @@ def unpack_unicode(data, pos, lenlen=2):
         # Uncompressed UTF-16-LE
         rawstrg = data[pos:pos+2*nchars]
         # if DEBUG: print "nchars=%d pos=%d rawstrg=%r" % (nchars, pos, rawstrg)
-        strg = unicode(rawstrg, 'utf_16_le')
+        strg = str(rawstrg, 'utf_16_le')
         # pos += 2*nchars
     else:
         # Note: this is COMPRESSED (not ASCII!) encoding!!!
@@ -291,7 +310,7 @@ def unpack_unicode(data, pos, lenlen=2):
         # if the local codepage was cp1252 -- however this would rapidly go pear-shaped
         # for other codepages so we grit our Anglocentric teeth and return Unicode :-)
 
-        strg = unicode(data[pos:pos+nchars], "latin_1")
+        strg = str(data[pos:pos+nchars], "latin_1")
         # pos += nchars
     # if richtext:
     #     pos += 4 * rt
@@ -306,28 +325,28 @@ def unpack_unicode_update_pos(data, pos, lenlen=2, known_len=None):
         # On a NAME record, the length byte is detached from the front of the string.
         nchars = known_len
     else:
-        nchars = unpack('<' + 'BH'[lenlen-1], data[pos:pos+lenlen])[0]
+        nchars = _unpack_nchars[lenlen](data, pos)[0]
         pos += lenlen
-    if not nchars and not data[pos:]:
+    if not nchars and pos >= len(data):
         # Zero-length string with no options byte
         return (UNICODE_LITERAL(""), pos)
-    options = BYTES_ORD(data[pos])
+    options = data[pos]
     pos += 1
     phonetic = options & 0x04
     richtext = options & 0x08
     if richtext:
-        rt = unpack('<H', data[pos:pos+2])[0]
+        rt = _unpack_rt(data, pos)[0]
         pos += 2
     if phonetic:
-        sz = unpack('<i', data[pos:pos+4])[0]
+        sz = _unpack_sz(data, pos)[0]
         pos += 4
     if options & 0x01:
         # Uncompressed UTF-16-LE
-        strg = unicode(data[pos:pos+2*nchars], 'utf_16_le')
+        strg = str(data[pos:pos+2*nchars], 'utf_16_le')
         pos += 2*nchars
     else:
         # Note: this is COMPRESSED (not ASCII!) encoding!!!
-        strg = unicode(data[pos:pos+nchars], "latin_1")
+        strg = str(data[pos:pos+nchars], "latin_1")
         pos += nchars
     if richtext:
         pos += 4 * rt
@@ -335,6 +354,12 @@ def unpack_unicode_update_pos(data, pos, lenlen=2, known_len=None):
         pos += sz
     return (strg, pos)
 
+# Cell range address list readers, keyed by address size
+_iter_unpack_cell_range = {
+    6: Struct("<HHBB").iter_unpack,
+    8: Struct("<HHHH").iter_unpack,
+}
+
 def unpack_cell_range_address_list_update_pos(output_list, data, pos, biff_version, addr_size=6):
     # output_list is updated in situ
     assert addr_size in (6, 8)
@@ -343,14 +368,15 @@ def unpack_cell_range_address_list_update_pos(output_list, data, pos, biff_versi
     n, = unpack("<H", data[pos:pos+2])
     pos += 2
     if n:
-        if addr_size == 6:
-            fmt = "<HHBB"
-        else:
-            fmt = "<HHHH"
-        for _unused in xrange(n):
-            ra, rb, ca, cb = unpack(fmt, data[pos:pos+addr_size])
-            output_list.append((ra, rb+1, ca, cb+1))
-            pos += addr_size
+        end = pos + n * addr_size
+        addrs = data[pos:end]
+        if len(addrs) != end - pos:
+            raise struct_error(
+                "unpack requires a buffer of %d bytes" % (end - pos))
+        output_list.extend(
+            (ra, rb+1, ca, cb+1)
+            for ra, rb, ca, cb in _iter_unpack_cell_range[addr_size](addrs))
+        pos = end
     return pos
 
 _brecstrg = """\
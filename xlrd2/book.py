@@ -20,6 +20,9 @@ except ImportError:
 
 import struct; unpack = struct.unpack
 
+# BIFF record header: (record type, data length), read in place from mem
+unpack_record_header = struct.Struct('<HH').unpack_from
+
 empty_cell = sheet.empty_cell # for exposure to the world ...
 
 DEBUG = 0
@@ -559,6 +562,10 @@ class Book(BaseObject):
         self.filestr = None
         self._sharedstrings = None
         self._rich_text_runlist_map = None
+        self._name_formula_cache = {}
+        self._name_operand_cache = {}
+        self._externsheet_local_ranges = {}
+        self._quoted_sheet_names = {}
 
     def __enter__(self):
         return self
@@ -606,6 +613,14 @@ class Book(BaseObject):
         self._resources_released = 0
         self.addin_func_names = []
         self.name_obj_list = []
+        # evaluate_name_formula() results, keyed by (formula bytes, length)
+        self._name_formula_cache = {}
+        # tName/tNameX operands of cleanly evaluated names, keyed by name index
+        self._name_operand_cache = {}
+        # get_externsheet_local_range() results, keyed by EXTERNSHEET index
+        self._externsheet_local_ranges = {}
+        # sheetrange() text for each sheet index
+        self._quoted_sheet_names = {}
         self.colour_map = {}
         self.palette_record = []
         self.xf_list = []
@@ -702,7 +717,7 @@ class Book(BaseObject):
     def get_record_parts(self):
         pos = self._position
         mem = self.mem
-        code, length = unpack('<HH', mem[pos:pos+4])
+        code, length = unpack_record_header(mem, pos)
         pos += 4
         data = mem[pos:pos+length]
         self._position = pos + length
@@ -711,7 +726,7 @@ class Book(BaseObject):
     def get_record_parts_conditional(self, reqd_record):
         pos = self._position
         mem = self.mem
-        code, length = unpack('<HH', mem[pos:pos+4])
+        code, length = unpack_record_header(mem, pos)
         if code != reqd_record:
             return (None, 0, b'')
         pos += 4
@@ -1072,8 +1087,9 @@ class Book(BaseObject):
         for namex in range(num_names):
             nobj = self.name_obj_list[namex]
             # Parse the formula ...
-            if nobj.macro:
-                dump_formula(self, nobj.raw_formula, len(nobj.raw_formula), self.biff_version, reldelta=0, blah=0)
+            if nobj.macro and blah:
+                # dump_formula only writes a trace; it computes nothing
+                dump_formula(self, nobj.raw_formula, len(nobj.raw_formula), self.biff_version, reldelta=0, blah=blah)
             if nobj.binary: continue
             if nobj.evaluated: continue
             evaluate_name_formula(self, nobj, namex, blah=blah)
@@ -10,9 +10,11 @@ Module for parsing/evaluating Microsoft Excel formulas.
 
 from __future__ import print_function
 
-import copy
+import functools
 import operator as opr
-from struct import unpack
+import sys
+from array import array
+from struct import Struct
 
 from .biffh import (
     BaseObject, XLRDError, error_text_from_code, hex_char_dump,
@@ -54,21 +56,35 @@ FMLA_TYPEDESCR_MAP = {
     32: 'NAME',
 }
 
+# FMLA_TYPEDESCR_MAP as a tuple: the name of type t is
+# _FMLA_TYPEDESCR_TUP[t.bit_length() - 1]
+_FMLA_TYPEDESCR_TUP = tuple(FMLA_TYPEDESCR_MAP[1 << i] for i in range(6))
+
+# The FMLA_TYPE_* values are distinct bits, so each entry is a bitmask of the
+# formula types in which the token may not appear.
 _TOKEN_NOT_ALLOWED = {
-    0x01:   ALL_FMLA_TYPES - FMLA_TYPE_CELL, # tExp
-    0x02:   ALL_FMLA_TYPES - FMLA_TYPE_CELL, # tTbl
-    0x0F:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tIsect
-    0x10:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tUnion/List
-    0x11:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tRange
-    0x20:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tArray
+    0x01:   ALL_FMLA_TYPES & ~FMLA_TYPE_CELL, # tExp
+    0x02:   ALL_FMLA_TYPES & ~FMLA_TYPE_CELL, # tTbl
+    0x0F:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tIsect
+    0x10:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tUnion/List
+    0x11:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tRange
+    0x20:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tArray
     0x23:   FMLA_TYPE_SHARED, # tName
-    0x39:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tNameX
-    0x3A:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tRef3d
-    0x3B:   FMLA_TYPE_SHARED + FMLA_TYPE_COND_FMT + FMLA_TYPE_DATA_VAL, # tArea3d
-    0x2C:   FMLA_TYPE_CELL + FMLA_TYPE_ARRAY, # tRefN
-    0x2D:   FMLA_TYPE_CELL + FMLA_TYPE_ARRAY, # tAreaN
+    0x39:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tNameX
+    0x3A:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tRef3d
+    0x3B:   FMLA_TYPE_SHARED | FMLA_TYPE_COND_FMT | FMLA_TYPE_DATA_VAL, # tArea3d
+    0x2C:   FMLA_TYPE_CELL | FMLA_TYPE_ARRAY, # tRefN
+    0x2D:   FMLA_TYPE_CELL | FMLA_TYPE_ARRAY, # tAreaN
     # plus weird stuff like tMem*
-}.get
+}
+
+# _TOKEN_NOT_ALLOWED_TBL[opx] -> mask of formula types in which the token is
+# not allowed; 0 means allowed everywhere.
+_TOKEN_NOT_ALLOWED_TBL = bytearray(256)
+for _opx, _mask in _TOKEN_NOT_ALLOWED.items():
+    _TOKEN_NOT_ALLOWED_TBL[_opx] = _mask
+_TOKEN_NOT_ALLOWED_TBL = bytes(_TOKEN_NOT_ALLOWED_TBL)
+del _opx, _mask
 
 oBOOL = 3
 oERR =  4
@@ -92,9 +108,22 @@ okind_dict = {
     6 : "oARR"
 }
 
+# okind_dict as a tuple: the name of kind k is _OKIND_NAMES[k + 2]
+_OKIND_NAMES = tuple(okind_dict[k] for k in range(-2, 7))
+
+# the operand kinds an IF test can be decided from
+_NUM_OR_BOOL = frozenset((oNUM, oBOOL))
+
 listsep = ',' #### probably should depend on locale
 
 
+# The token loops (evaluate_name_formula, decompile_formula, dump_formula)
+# are bound by interpreter dispatch, not by memory traffic: formula buffers
+# are rarely more than a few hundred bytes. The tables they consult per token
+# are therefore kept flat and index-addressed (signed-byte size rows, a
+# 256-byte forbidden-token mask, per-field function arrays), and are built
+# once at import from the readable definitions in this module.
+
 # sztabN[opcode] -> the number of bytes to consume.
 # -1 means variable
 # -2 means this opcode not implemented in this version.
@@ -105,6 +134,12 @@ sztab2 = [-2, 5, 5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1,
 sztab3 = [-2, 5, 5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, -1, -2, -1, -2, -2, 2, 2, 3, 9, 9, 3, 4, 15, 4, 7, 7, 7, 7, 3, 4, 7, 4, 7, 3, 3, -2, -2, -2, -2, -2, -2, -2, -2, -2, 25, 18, 21, 18, 21, -2, -2]
 sztab4 = [-2, 5, 5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, -1, -1, -1, -2, -2, 2, 2, 3, 9, 9, 3, 4, 5, 5, 9, 7, 7, 7, 3, 5, 9, 5, 9, 3, 3, -2, -2, -2, -2, -2, -2, -2, -2, -2, 7, 7, 11, 7, 11, -2, -2]
 
+# All five tables live in one contiguous signed-byte block; each sztabN is a
+# 64-entry memoryview of its row.
+_SZTAB_BLOCK = array('b', sztab0 + sztab1 + sztab2 + sztab3 + sztab4)
+sztab0, sztab1, sztab2, sztab3, sztab4 = [
+    memoryview(_SZTAB_BLOCK)[row * 64:(row + 1) * 64] for row in range(5)]
+
 szdict = {
     20 : sztab0,
     21 : sztab0,
@@ -116,6 +151,20 @@ szdict = {
     80 : sztab4,
 }
 
+# The token preamble for each BIFF version: a tuple indexed by the raw
+# token byte, giving (opcode, optype, opx, size); opx indexes sztabN and
+# onames.
+_TOKEN_FIELDS = []
+for _op in range(256):
+    _opcode = _op & 0x1f
+    _optype = (_op & 0x60) >> 5
+    _TOKEN_FIELDS.append((_opcode, _optype, _opcode + 32 if _optype else _opcode))
+_TOKEN_PREAMBLE = {
+    _bv: tuple(fields + (_sztab[fields[2]],) for fields in _TOKEN_FIELDS)
+    for _bv, _sztab in szdict.items()
+}
+del _op, _opcode, _optype, _TOKEN_FIELDS
+
 # For debugging purposes ... the name for each opcode
 # (without the prefix "t" used on OOo docs)
 onames = ['Unk00', 'Exp', 'Tbl', 'Add', 'Sub', 'Mul', 'Div', 'Power', 'Concat', 'LT', 'LE', 'EQ', 'GE', 'GT', 'NE', 'Isect', 'List', 'Range', 'Uplus', 'Uminus', 'Percent', 'Paren', 'MissArg', 'Str', 'Extended', 'Attr', 'Sheet', 'EndSheet', 'Err', 'Bool', 'Int', 'Num', 'Array', 'Func', 'FuncVar', 'Name', 'Ref', 'Area', 'MemArea', 'MemErr', 'MemNoMem', 'MemFunc', 'RefErr', 'AreaErr', 'RefN', 'AreaN', 'MemAreaN', 'MemNoMemN', '', '', '', '', '', '', '', '', 'FuncCE', 'NameX', 'Ref3d', 'Area3d', 'RefErr3d', 'AreaErr3d', '', '']
@@ -895,9 +944,82 @@ tAttrNames = {
     0x41: "SpaceVolatile",
 }
 
-func_names = set([func[0] for index, func in func_defs.items()])
+def __getattr__(name):
+    # func_names is not used by the parsers; build it on first access only.
+    if name == 'func_names':
+        global func_names
+        func_names = set([func[0] for index, func in func_defs.items()])
+        return func_names
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+_unpack_B = Struct("<B").unpack_from
+_unpack_H = Struct("<H").unpack_from
+_unpack_d = Struct("<d").unpack_from
+_unpack_BH = Struct("<BH").unpack_from
+_unpack_HB = Struct("<HB").unpack_from
+_unpack_HH = Struct("<HH").unpack_from
+_unpack_HHBB = Struct("<HHBB").unpack_from
+_unpack_HHHH = Struct("<HHHH").unpack_from
+_unpack_h8xH = Struct("<hxxxxxxxxH").unpack_from
+_unpack_h8xhh = Struct("<hxxxxxxxxhh").unpack_from
+
+# (operand kind, value unpacker) for tErr, tBool, tInt, tNum
+_CONST_TOKENS = (
+    (oERR, _unpack_B),
+    (oBOOL, _unpack_B),
+    (oNUM, _unpack_H),
+    (oNUM, _unpack_d),
+)
+
+# the text of a tErr token, by error code
+_ERROR_TOKEN_TEXT = {
+    code: '"' + text + '"' for code, text in error_text_from_code.items()}
+
+# Operand unpackers for tFunc (FuncID) and tFuncVar (nargs, FuncID), keyed by
+# "FuncID is 2 bytes": it is 1 byte before BIFF 4.0 and 2 bytes from then on.
+# The parsers pick their pair once per call instead of building a format
+# string per token.
+_FUNC_TOKEN_UNPACKERS = {
+    False: (_unpack_B, Struct("<BB").unpack_from),
+    True: (_unpack_H, _unpack_BH),
+}
+
+# func_defs flattened into one array per field, indexed by function number.
+# Names are interned: many macro function names ('GET.CELL', ...) are not
+# identifiers, so the compiler does not intern them itself.
+# Worksheet functions (FuncID < _FD_LOW_SIZE) are direct-indexed: the name of
+# FuncID funcx is _FD_NAME[funcx], or None if it is undefined. The rarer
+# command-equivalent macro functions (0x8000 <= FuncID < _FD_HIGH_END) are
+# in _FD_HIGH[FuncID - 0x8000] as (name, min#args, max#args) tuples.
+_FD_LOW_SIZE = 512
+# (name, min#args, max#args) of an undefined FuncID
+_FD_MISSING = (None, 0, 0)
+
+def _flatten_func_defs():
+    names = [None] * _FD_LOW_SIZE
+    minargs = bytearray(_FD_LOW_SIZE)
+    maxargs = bytearray(_FD_LOW_SIZE)
+    high = [_FD_MISSING] * (max(func_defs) + 1 - 0x8000)
+    for funcx, func in func_defs.items():
+        name = sys.intern(func[0])
+        if funcx < _FD_LOW_SIZE:
+            names[funcx] = name
+            minargs[funcx] = func[1]
+            maxargs[funcx] = func[2]
+        else:
+            assert funcx >= 0x8000
+            high[funcx - 0x8000] = (name, func[1], func[2])
+    return names, minargs, maxargs, high
+
+_FD_NAME, _FD_MIN, _FD_MAX, _FD_HIGH = _flatten_func_defs()
+_FD_HIGH_END = 0x8000 + len(_FD_HIGH)
+del _flatten_func_defs
 
-error_opcodes = set([0x07, 0x08, 0x0A, 0x0B, 0x1C, 0x1D, 0x2F])
+error_opcodes = frozenset([0x07, 0x08, 0x0A, 0x0B, 0x1C, 0x1D, 0x2F])
+
+# error_opcodes and tAttrNames as tables indexed by a token (sub)opcode byte
+_ERROR_OP_MASK = bytes([int(i in error_opcodes) for i in range(256)])
+_TATTR_NAMES = tuple(tAttrNames.get(i, "??Unknown??") for i in range(256))
 
 tRangeFuncs = (min, max, min, max, min, max)
 tIsectFuncs = (max, min, max, min, max, min)
@@ -908,16 +1030,40 @@ def do_box_funcs(box_funcs, boxa, boxb):
         for func, numa, numb in zip(box_funcs, boxa.coords, boxb.coords)
     )
 
+# do_box_funcs(tRangeFuncs, ...) and do_box_funcs(tIsectFuncs, ...) unrolled,
+# taking the two coords 6-tuples directly.
+def _range_coords(a, b):
+    return (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]),
+            max(a[3], b[3]), min(a[4], b[4]), max(a[5], b[5]))
+
+def _isect_coords(a, b):
+    return (max(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]),
+            min(a[3], b[3]), max(a[4], b[4]), min(a[5], b[5]))
+
+# Operator text; an operand is bracketed if it binds less tightly than
+# the operator.
+
+def _binop_text(aop, sym, bop, rank):
+    atext = aop.text if aop.rank >= rank else f"({aop.text})"
+    btext = bop.text if bop.rank >= rank else f"({bop.text})"
+    return f"{atext}{sym}{btext}"
+
+def _unop_text(sym1, aop, sym2, rank):
+    if aop.rank < rank:
+        return f"{sym1}({aop.text}){sym2}"
+    return f"{sym1}{aop.text}{sym2}"
+
 def adjust_cell_addr_biff8(rowval, colval, reldelta, browx=None, bcolx=None):
     row_rel = (colval >> 15) & 1
     col_rel = (colval >> 14) & 1
     rowx = rowval
     colx = colval & 0xff
     if reldelta:
-        if row_rel and rowx >= 32768:
-            rowx -= 65536
-        if col_rel and colx >= 128:
-            colx -= 256
+        # relative offsets are two's complement: sign-extend them
+        if row_rel:
+            rowx = (rowx ^ 0x8000) - 0x8000
+        if col_rel:
+            colx = (colx ^ 0x80) - 0x80
     else:
         if row_rel and browx:
             rowx -= browx
@@ -932,10 +1078,11 @@ def adjust_cell_addr_biff_le7(
     rowx = rowval & 0x3fff
     colx = colval
     if reldelta:
-        if row_rel and rowx >= 8192:
-            rowx -= 16384
-        if col_rel and colx >= 128:
-            colx -= 256
+        # relative offsets are two's complement: sign-extend them
+        if row_rel:
+            rowx = (rowx ^ 0x2000) - 0x2000
+        if col_rel:
+            colx = (colx ^ 0x80) - 0x80
     else:
         if row_rel:
             rowx -= browx
@@ -943,36 +1090,60 @@ def adjust_cell_addr_biff_le7(
             colx -= bcolx
     return rowx, colx, row_rel, col_rel
 
+def _get_cell_addr_b8(data, pos, reldelta, browx=None, bcolx=None):
+    rowval, colval = _unpack_HH(data, pos)
+    # print "    rv=%04xh cv=%04xh" % (rowval, colval)
+    return adjust_cell_addr_biff8(rowval, colval, reldelta, browx, bcolx)
+
+def _get_cell_addr_le7(data, pos, reldelta, browx=None, bcolx=None):
+    rowval, colval = _unpack_HB(data, pos)
+    # print "    rv=%04xh cv=%04xh" % (rowval, colval)
+    return adjust_cell_addr_biff_le7(rowval, colval, reldelta, browx, bcolx)
+
+def _get_cell_range_addr_b8(data, pos, reldelta, browx=None, bcolx=None):
+    row1val, row2val, col1val, col2val = _unpack_HHHH(data, pos)
+    # print "    rv=%04xh cv=%04xh" % (row1val, col1val)
+    # print "    rv=%04xh cv=%04xh" % (row2val, col2val)
+    res1 = adjust_cell_addr_biff8(row1val, col1val, reldelta, browx, bcolx)
+    res2 = adjust_cell_addr_biff8(row2val, col2val, reldelta, browx, bcolx)
+    return res1, res2
+
+def _get_cell_range_addr_le7(data, pos, reldelta, browx=None, bcolx=None):
+    row1val, row2val, col1val, col2val = _unpack_HHBB(data, pos)
+    # print "    rv=%04xh cv=%04xh" % (row1val, col1val)
+    # print "    rv=%04xh cv=%04xh" % (row2val, col2val)
+    res1 = adjust_cell_addr_biff_le7(
+                row1val, col1val, reldelta, browx, bcolx)
+    res2 = adjust_cell_addr_biff_le7(
+                row2val, col2val, reldelta, browx, bcolx)
+    return res1, res2
+
+# (cell address reader, cell range address reader), keyed by "is BIFF8";
+# the parsers select their pair once per formula.
+_CELL_ADDR_READERS = {
+    True: (_get_cell_addr_b8, _get_cell_range_addr_b8),
+    False: (_get_cell_addr_le7, _get_cell_range_addr_le7),
+}
+
 def get_cell_addr(data, pos, bv, reldelta, browx=None, bcolx=None):
-    if bv >= 80:
-        rowval, colval = unpack("<HH", data[pos:pos+4])
-        # print "    rv=%04xh cv=%04xh" % (rowval, colval)
-        return adjust_cell_addr_biff8(rowval, colval, reldelta, browx, bcolx)
-    else:
-        rowval, colval = unpack("<HB", data[pos:pos+3])
-        # print "    rv=%04xh cv=%04xh" % (rowval, colval)
-        return adjust_cell_addr_biff_le7(
-                    rowval, colval, reldelta, browx, bcolx)
+    return _CELL_ADDR_READERS[bv >= 80][0](data, pos, reldelta, browx, bcolx)
 
 def get_cell_range_addr(data, pos, bv, reldelta, browx=None, bcolx=None):
-    if bv >= 80:
-        row1val, row2val, col1val, col2val = unpack("<HHHH", data[pos:pos+8])
-        # print "    rv=%04xh cv=%04xh" % (row1val, col1val)
-        # print "    rv=%04xh cv=%04xh" % (row2val, col2val)
-        res1 = adjust_cell_addr_biff8(row1val, col1val, reldelta, browx, bcolx)
-        res2 = adjust_cell_addr_biff8(row2val, col2val, reldelta, browx, bcolx)
-        return res1, res2
-    else:
-        row1val, row2val, col1val, col2val = unpack("<HHBB", data[pos:pos+6])
-        # print "    rv=%04xh cv=%04xh" % (row1val, col1val)
-        # print "    rv=%04xh cv=%04xh" % (row2val, col2val)
-        res1 = adjust_cell_addr_biff_le7(
-                    row1val, col1val, reldelta, browx, bcolx)
-        res2 = adjust_cell_addr_biff_le7(
-                    row2val, col2val, reldelta, browx, bcolx)
-        return res1, res2
+    return _CELL_ADDR_READERS[bv >= 80][1](data, pos, reldelta, browx, bcolx)
 
 def get_externsheet_local_range(bk, refx, blah=0):
+    # The result only depends on the workbook's EXTERNSHEET/SUPBOOK tables,
+    # so it is memoised per refx; not while debugging, to keep the trace.
+    cache = bk._externsheet_local_ranges
+    if not blah and refx in cache:
+        return cache[refx]
+    result = _get_externsheet_local_range(bk, refx, blah)
+    # An out-of-range refx is not cached, so it is reported every time.
+    if result != (-101, -101):
+        cache[refx] = result
+    return result
+
+def _get_externsheet_local_range(bk, refx, blah):
     try:
         info = bk._externsheet_info[refx]
     except IndexError:
@@ -980,31 +1151,35 @@ def get_externsheet_local_range(bk, refx, blah=0):
             % (refx, len(bk._externsheet_info)), file=bk.logfile)
         return (-101, -101)
     ref_recordx, ref_first_sheetx, ref_last_sheetx = info
-    if ref_recordx == bk._supbook_addins_inx:
-        if blah:
-            print("/// get_externsheet_local_range(refx=%d) -> addins %r" % (refx, info), file=bk.logfile)
-        assert ref_first_sheetx == 0xFFFE == ref_last_sheetx
-        return (-5, -5)
+    # The common case, a reference into this workbook, is tested first;
+    # the add-in and external SUPBOOK records are necessarily distinct
+    # from the local one.
     if ref_recordx != bk._supbook_locals_inx:
+        if ref_recordx == bk._supbook_addins_inx:
+            if blah:
+                print("/// get_externsheet_local_range(refx=%d) -> addins %r" % (refx, info), file=bk.logfile)
+            assert ref_first_sheetx == 0xFFFE == ref_last_sheetx
+            return (-5, -5)
         if blah:
             print("/// get_externsheet_local_range(refx=%d) -> external %r" % (refx, info), file=bk.logfile)
         return (-4, -4) # external reference
-    if ref_first_sheetx == 0xFFFE == ref_last_sheetx:
-        if blah:
-            print("/// get_externsheet_local_range(refx=%d) -> unspecified sheet %r" % (refx, info), file=bk.logfile)
-        return (-1, -1) # internal reference, any sheet
-    if ref_first_sheetx == 0xFFFF == ref_last_sheetx:
+    if ref_first_sheetx >= 0xFFFE and ref_first_sheetx == ref_last_sheetx:
+        if ref_first_sheetx == 0xFFFE:
+            if blah:
+                print("/// get_externsheet_local_range(refx=%d) -> unspecified sheet %r" % (refx, info), file=bk.logfile)
+            return (-1, -1) # internal reference, any sheet
         if blah:
             print("/// get_externsheet_local_range(refx=%d) -> deleted sheet(s)" % (refx, ), file=bk.logfile)
         return (-2, -2) # internal reference, deleted sheet(s)
-    nsheets = len(bk._all_sheets_map)
+    all_sheets_map = bk._all_sheets_map
+    nsheets = len(all_sheets_map)
     if not(0 <= ref_first_sheetx <= ref_last_sheetx < nsheets):
         if blah:
             print("/// get_externsheet_local_range(refx=%d) -> %r" % (refx, info), file=bk.logfile)
             print("--- first/last sheet not in range(%d)" % nsheets, file=bk.logfile)
         return (-102, -102) # stuffed up somewhere :-(
-    xlrd_sheetx1 = bk._all_sheets_map[ref_first_sheetx]
-    xlrd_sheetx2 = bk._all_sheets_map[ref_last_sheetx]
+    xlrd_sheetx1 = all_sheets_map[ref_first_sheetx]
+    xlrd_sheetx2 = all_sheets_map[ref_last_sheetx]
     if not(0 <= xlrd_sheetx1 <= xlrd_sheetx2):
         return (-3, -3) # internal reference, but to a macro sheet
     return xlrd_sheetx1, xlrd_sheetx2
@@ -1017,21 +1192,22 @@ def get_externsheet_local_range_b57(
         return (-4, -4) # external reference
     if ref_first_sheetx == -1 and ref_last_sheetx == -1:
         return (-2, -2) # internal reference, deleted sheet(s)
-    nsheets = len(bk._all_sheets_map)
+    all_sheets_map = bk._all_sheets_map
+    nsheets = len(all_sheets_map)
     if not(0 <= ref_first_sheetx <= ref_last_sheetx < nsheets):
         if blah:
             print("/// get_externsheet_local_range_b57(%d, %d, %d) -> ???"
                 % (raw_extshtx, ref_first_sheetx, ref_last_sheetx), file=bk.logfile)
             print("--- first/last sheet not in range(%d)" % nsheets, file=bk.logfile)
         return (-103, -103) # stuffed up somewhere :-(
-    xlrd_sheetx1 = bk._all_sheets_map[ref_first_sheetx]
-    xlrd_sheetx2 = bk._all_sheets_map[ref_last_sheetx]
+    xlrd_sheetx1 = all_sheets_map[ref_first_sheetx]
+    xlrd_sheetx2 = all_sheets_map[ref_last_sheetx]
     if not(0 <= xlrd_sheetx1 <= xlrd_sheetx2):
         return (-3, -3) # internal reference, but to a macro sheet
     return xlrd_sheetx1, xlrd_sheetx2
 
 class FormulaError(Exception):
-    pass
+    __slots__ = ()
 
 
 class Operand(object):
@@ -1097,36 +1273,54 @@ class Operand(object):
         </table>
     """
 
-    #: None means that the actual value of the operand is a variable
-    #: (depends on cell data), not a constant.
-    value = None
-
-    #: oUNK means that the kind of operand is not known unambiguously.
-    kind = oUNK
+    __slots__ = ('kind', 'value', 'rank', 'text')
 
-    #: The reconstituted text of the original formula. Function names will be
-    #: in English irrespective of the original language, which doesn't seem
-    #: to be recorded anywhere. The separator is ",", not ";" or whatever else
-    #: might be more appropriate for the end-user's locale; patches welcome.
-    text = '?'
-
-    def __init__(self, akind=None, avalue=None, arank=0, atext='?'):
-        if akind is not None:
-            self.kind = akind
-        if avalue is not None:
-            self.value = avalue
-        self.rank = arank
+    def __init__(self, akind=oUNK, avalue=None, arank=0, atext='?'):
+        #: oUNK means that the kind of operand is not known unambiguously.
+        self.kind = akind
+        #: None means that the actual value of the operand is a variable
+        #: (depends on cell data), not a constant.
+        self.value = avalue
         # rank is an internal gizmo (operator precedence);
         # it's used in reconstructing formula text.
+        self.rank = arank
+        #: The reconstituted text of the original formula. Function names will be
+        #: in English irrespective of the original language, which doesn't seem
+        #: to be recorded anywhere. The separator is ",", not ";" or whatever else
+        #: might be more appropriate for the end-user's locale; patches welcome.
         self.text = atext
 
+    def clone(self):
+        """
+        Return a copy of this operand. A list value (of :class:`Ref3D`) is
+        copied; everything else is immutable and shared.
+        """
+        o = Operand.__new__(Operand)
+        o.kind = self.kind
+        value = self.value
+        o.value = list(value) if isinstance(value, list) else value
+        o.rank = self.rank
+        o.text = self.text
+        return o
+
+    # Slotted classes need explicit state for pickle protocols 0 and 1.
+    def __getstate__(self):
+        return (self.kind, self.value, self.rank, self.text)
+
+    def __setstate__(self, state):
+        self.kind, self.value, self.rank, self.text = state
+
     def __repr__(self):
-        kind_text = okind_dict.get(self.kind, "?Unknown kind?")
+        kind = self.kind
+        if -2 <= kind <= 6:
+            kind_text = _OKIND_NAMES[kind + 2]
+        else:
+            kind_text = "?Unknown kind?"
         return "Operand(kind=%s, value=%r, text=%r)" \
             % (kind_text, self.value, self.text)
 
 
-class Ref3D(tuple):
+class Ref3D(object):
     """
     Represents an absolute or relative 3-dimensional reference to a box
     of one or more cells.
@@ -1173,16 +1367,65 @@ class Ref3D(tuple):
       ``relflags = (1, 1, ...)``.
 
     .. versionadded:: 0.6.0
+
+    .. note::
+      :class:`Ref3D` is no longer a :class:`tuple` subclass, but it still
+      behaves as the 12-tuple ``coords + relflags`` for indexing, ``len()``,
+      iteration, unpacking and comparison.
     """
 
-    def __init__(self, atuple):
-        self.coords = atuple[0:6]
-        self.relflags = atuple[6:12]
-        if not self.relflags:
-            self.relflags = (0, 0, 0, 0, 0, 0)
-        (self.shtxlo, self.shtxhi,
-        self.rowxlo, self.rowxhi,
-        self.colxlo, self.colxhi) = self.coords
+    __slots__ = ('coords', 'relflags')
+
+    def __init__(self, atuple, relflags=None):
+        # Either one tuple of 6 coords optionally followed by 6 relflags,
+        # or the coords and relflags 6-tuples as separate arguments.
+        if relflags is None:
+            self.coords = atuple[0:6]
+            self.relflags = atuple[6:12] or (0, 0, 0, 0, 0, 0)
+        else:
+            self.coords = atuple
+            self.relflags = relflags
+
+    # The individual coords are views of the coords tuple, not copies.
+    shtxlo = property(lambda self: self.coords[0])
+    shtxhi = property(lambda self: self.coords[1])
+    rowxlo = property(lambda self: self.coords[2])
+    rowxhi = property(lambda self: self.coords[3])
+    colxlo = property(lambda self: self.coords[4])
+    colxhi = property(lambda self: self.coords[5])
+
+    # Tuple compatibility: Ref3D used to be a tuple of coords + relflags.
+    def __iter__(self):
+        return iter(self.coords + self.relflags)
+
+    def __len__(self):
+        return len(self.coords) + len(self.relflags)
+
+    def __getitem__(self, index):
+        return (self.coords + self.relflags)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Ref3D):
+            return self.coords == other.coords and self.relflags == other.relflags
+        if isinstance(other, tuple):
+            return self.coords + self.relflags == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        # same hash as the equal tuple
+        return hash(self.coords + self.relflags)
+
+    def __getstate__(self):
+        return (self.coords, self.relflags)
+
+    def __setstate__(self, state):
+        self.coords, self.relflags = state
 
     def __repr__(self):
         if not self.relflags or self.relflags == (0, 0, 0, 0, 0, 0):
@@ -1203,15 +1446,6 @@ tLT, tLE, tEQ, tGE, tGT, tNE = range(0x09, 0x0F)
 def nop(x):
     return x
 
-def _opr_pow(x, y): return x ** y
-
-def _opr_lt(x, y): return x <  y
-def _opr_le(x, y): return x <= y
-def _opr_eq(x, y): return x == y
-def _opr_ge(x, y): return x >= y
-def _opr_gt(x, y): return x >  y
-def _opr_ne(x, y): return x != y
-
 def num2strg(num):
     """
     Attempt to emulate Excel's default conversion from number to string.
@@ -1230,16 +1464,19 @@ binop_rules = {
     tSub:   (_arith_argdict, oNUM, opr.sub,  30, '-'),
     tMul:   (_arith_argdict, oNUM, opr.mul,  40, '*'),
     tDiv:   (_arith_argdict, oNUM, opr.truediv,  40, '/'),
-    tPower: (_arith_argdict, oNUM, _opr_pow, 50, '^',),
+    tPower: (_arith_argdict, oNUM, opr.pow,  50, '^',),
     tConcat:(_strg_argdict, oSTRG, opr.add,  20, '&'),
-    tLT:    (_cmp_argdict, oBOOL, _opr_lt,   10, '<'),
-    tLE:    (_cmp_argdict, oBOOL, _opr_le,   10, '<='),
-    tEQ:    (_cmp_argdict, oBOOL, _opr_eq,   10, '='),
-    tGE:    (_cmp_argdict, oBOOL, _opr_ge,   10, '>='),
-    tGT:    (_cmp_argdict, oBOOL, _opr_gt,   10, '>'),
-    tNE:    (_cmp_argdict, oBOOL, _opr_ne,   10, '<>'),
+    tLT:    (_cmp_argdict, oBOOL, opr.lt,    10, '<'),
+    tLE:    (_cmp_argdict, oBOOL, opr.le,    10, '<='),
+    tEQ:    (_cmp_argdict, oBOOL, opr.eq,    10, '='),
+    tGE:    (_cmp_argdict, oBOOL, opr.ge,    10, '>='),
+    tGT:    (_cmp_argdict, oBOOL, opr.gt,    10, '>'),
+    tNE:    (_cmp_argdict, oBOOL, opr.ne,    10, '<>'),
 }
 
+# binop_rules as a tuple indexed by opcode - tAdd
+_BINOP_RULES = tuple(binop_rules[opcode] for opcode in range(tAdd, tNE + 1))
+
 unop_rules = {
     0x13: (lambda x: -x,        70, '-', ''), # unary minus
     0x12: (lambda x: x,         70, '+', ''), # unary plus
@@ -1265,7 +1502,26 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
         hex_char_dump(data, 0, fmlalen, fout=bk.logfile)
     if level > STACK_PANIC_LEVEL:
         raise XLRDError("Excessive indirect references in NAME formula")
-    sztab = szdict[bv]
+    # Many names share the same formula; reuse an earlier result unless
+    # debugging, when the trace is wanted.
+    cache_key = (data, fmlalen)
+    cached = None if blah else bk._name_formula_cache.get(cache_key)
+    if cached is not None:
+        stack, nobj.any_rel, nobj.any_err, nobj.any_external = cached
+        # each name gets operands of its own
+        nobj.stack = stack = [opnd.clone() for opnd in stack]
+        nobj.result = stack[0] if len(stack) == 1 else None
+        nobj.evaluated = 1
+        return
+    # The result only depends on namex through tNameX's self-reference
+    # check; formulas containing tNameX are not cached.
+    cacheable = 1
+    # tName/tNameX result operands of names that evaluated cleanly,
+    # keyed by name index
+    name_operands = {} if blah else bk._name_operand_cache
+    preamble = _TOKEN_PREAMBLE[bv]
+    unpack_func, unpack_funcvar = _FUNC_TOKEN_UNPACKERS[bv >= 40]
+    get_addr, get_range_addr = _CELL_ADDR_READERS[bv >= 80]
     pos = 0
     stack = []
     any_rel = 0
@@ -1275,20 +1531,12 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
     error_opnd = Operand(oERR, None)
     spush = stack.append
 
-    def do_binop(opcd, stk):
+    def do_binop(binopx, stk):
         assert len(stk) >= 2
         bop = stk.pop()
         aop = stk.pop()
-        argdict, result_kind, func, rank, sym = binop_rules[opcd]
-        otext = ''.join([
-            '('[:aop.rank < rank],
-            aop.text,
-            ')'[:aop.rank < rank],
-            sym,
-            '('[:bop.rank < rank],
-            bop.text,
-            ')'[:bop.rank < rank],
-        ])
+        argdict, result_kind, func, rank, sym = _BINOP_RULES[binopx]
+        otext = _binop_text(aop, sym, bop, rank)
         resop = Operand(result_kind, None, rank, otext)
         try:
             bconv = argdict[bop.kind]
@@ -1312,13 +1560,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
         aop = stk.pop()
         val = aop.value
         func, rank, sym1, sym2 = unop_rules[opcode]
-        otext = ''.join([
-            sym1,
-            '('[:aop.rank < rank],
-            aop.text,
-            ')'[:aop.rank < rank],
-            sym2,
-        ])
+        otext = _unop_text(sym1, aop, sym2, rank)
         if val is not None:
             val = func(val)
         stk.append(Operand(result_kind, val, rank, otext))
@@ -1332,31 +1574,24 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
         stack = [unk_opnd]
 
     while 0 <= pos < fmlalen:
-        op = BYTES_ORD(data[pos])
-        opcode = op & 0x1f
-        optype = (op & 0x60) >> 5
-        if optype:
-            opx = opcode + 32
-        else:
-            opx = opcode
-        oname = onames[opx] # + [" RVA"][optype]
-        sz = sztab[opx]
+        op = data[pos]
+        opcode, optype, opx, sz = preamble[op]
         if blah:
             print("Pos:%d Op:0x%02x Name:t%s Sz:%d opcode:%02xh optype:%02xh"
-                % (pos, op, oname, sz, opcode, optype), file=bk.logfile)
+                % (pos, op, onames[opx], sz, opcode, optype), file=bk.logfile)
             print("Stack =", stack, file=bk.logfile)
         if sz == -2:
             msg = 'ERROR *** Unexpected token 0x%02x ("%s"); biff_version=%d' \
-                % (op, oname, bv)
+                % (op, onames[opx], bv)
             raise FormulaError(msg)
         if not optype:
             if 0x00 <= opcode <= 0x02: # unk_opnd, tExp, tTbl
-                not_in_name_formula(op, oname)
+                not_in_name_formula(op, onames[opx])
             elif 0x03 <= opcode <= 0x0E:
                 # Add, Sub, Mul, Div, Power
                 # tConcat
                 # tLT, ..., tNE
-                do_binop(opcode, stack)
+                do_binop(opcode - 0x03, stack)
             elif opcode == 0x0F: # tIsect
                 if blah: print("tIsect pre", stack, file=bk.logfile)
                 assert len(stack) >= 2
@@ -1364,15 +1599,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 aop = stack.pop()
                 sym = ' '
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF)
                 res.text = otext
                 if bop.kind == oERR or aop.kind == oERR:
@@ -1389,20 +1616,20 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                     if aop.value is not None and bop.value is not None:
                         assert len(aop.value) == 1
                         assert len(bop.value) == 1
-                        coords = do_box_funcs(
-                            tIsectFuncs, aop.value[0], bop.value[0])
+                        coords = _isect_coords(
+                            aop.value[0].coords, bop.value[0].coords)
                         res.value = [Ref3D(coords)]
                 elif bop.kind == oREL == aop.kind:
                     res.kind = oREL
                     if aop.value is not None and bop.value is not None:
                         assert len(aop.value) == 1
                         assert len(bop.value) == 1
-                        coords = do_box_funcs(
-                            tIsectFuncs, aop.value[0], bop.value[0])
+                        coords = _isect_coords(
+                            aop.value[0].coords, bop.value[0].coords)
                         relfa = aop.value[0].relflags
                         relfb = bop.value[0].relflags
                         if relfa == relfb:
-                            res.value = [Ref3D(coords + relfa)]
+                            res.value = [Ref3D(coords, relfa)]
                 else:
                     pass
                 spush(res)
@@ -1414,15 +1641,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 aop = stack.pop()
                 sym = ','
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF, None, rank, otext)
                 if bop.kind == oERR or aop.kind == oERR:
                     res.kind = oERR
@@ -1445,15 +1664,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 aop = stack.pop()
                 sym = ':'
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF, None, rank, otext)
                 if bop.kind == oERR or aop.kind == oERR:
                     res = oERR
@@ -1461,20 +1672,20 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                     if aop.value is not None and bop.value is not None:
                         assert len(aop.value) == 1
                         assert len(bop.value) == 1
-                        coords = do_box_funcs(
-                            tRangeFuncs, aop.value[0], bop.value[0])
+                        coords = _range_coords(
+                            aop.value[0].coords, bop.value[0].coords)
                         res.value = [Ref3D(coords)]
                 elif bop.kind == oREL == aop.kind:
                     res.kind = oREL
                     if aop.value is not None and bop.value is not None:
                         assert len(aop.value) == 1
                         assert len(bop.value) == 1
-                        coords = do_box_funcs(
-                            tRangeFuncs, aop.value[0], bop.value[0])
+                        coords = _range_coords(
+                            aop.value[0].coords, bop.value[0].coords)
                         relfa = aop.value[0].relflags
                         relfb = bop.value[0].relflags
                         if relfa == relfb:
-                            res.value = [Ref3D(coords + relfa)]
+                            res.value = [Ref3D(coords, relfa)]
                 else:
                     pass
                 spush(res)
@@ -1503,8 +1714,8 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 # not in OOo docs
                 raise FormulaError("tExtended token not implemented")
             elif opcode == 0x19: # tAttr
-                subop, nc = unpack("<BH", data[pos+1:pos+4])
-                subname = tAttrNames.get(subop, "??Unknown??")
+                subop, nc = _unpack_BH(data, pos+1)
+                subname = _TATTR_NAMES[subop]
                 if subop == 0x04: # Choose
                     sz = nc * 2 + 6
                 elif subop == 0x10: # Sum (single arg)
@@ -1524,9 +1735,8 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 raise FormulaError("tSheet & tEndsheet tokens not implemented")
             elif 0x1C <= opcode <= 0x1F: # tErr, tBool, tInt, tNum
                 inx = opcode - 0x1C
-                nb = [1, 1, 2, 8][inx]
-                kind = [oERR, oBOOL, oNUM, oNUM][inx]
-                value, = unpack("<" + "BBHd"[inx], data[pos+1:pos+1+nb])
+                kind, unpack_value = _CONST_TOKENS[inx]
+                value, = unpack_value(data, pos+1)
                 if inx == 2: # tInt
                     value = float(value)
                     text = str(value)
@@ -1535,7 +1745,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 elif inx == 1: # tBool
                     text = ('FALSE', 'TRUE')[value]
                 else:
-                    text = '"' +error_text_from_code[value] + '"'
+                    text = _ERROR_TOKEN_TEXT[value]
                 spush(Operand(kind, value, LEAF_RANK, text))
             else:
                 raise FormulaError("Unhandled opcode: 0x%02x" % opcode)
@@ -1552,14 +1762,14 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             index = pos + 11
 
             while(True):
-                (rec_type,) = unpack("B", data[index: index + 1])
+                (rec_type,) = _unpack_B(data, index)
                 index += 1
                 if rec_type == 1: # float 8bytes
-                    (float_data,) = unpack("< d", data[index: index + 8])
+                    (float_data,) = _unpack_d(data, index)
                     array.append(float_data)
                     index += 8
                 elif rec_type == 2: #string (Unicode Strings in BIFF8)
-                    size, option = unpack("< HB", data[index: index + 3])
+                    size, option = _unpack_HB(data, index)
                     index += 3
                     # assuming the first bit of option is 0, meaning it is a compressed unicode string
                     arr_data = data[index: index+size].decode('ascii')
@@ -1574,25 +1784,28 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             res = Operand(oARR, array, FUNC_RANK, str(array) )
             spush(res)
         elif opcode == 0x01: # tFunc
-            nb = 1 + int(bv >= 40)
-            funcx = unpack("<" + " BH"[nb], data[pos+1:pos+1+nb])[0]
-            func_attrs = func_defs.get(funcx, None)
-            if not func_attrs:
+            funcx = unpack_func(data, pos+1)[0]
+            if funcx < _FD_LOW_SIZE:
+                func_name = _FD_NAME[funcx]
+                nargs = _FD_MIN[funcx]
+            else:
+                func_name, nargs, _ = (_FD_HIGH[funcx - 0x8000]
+                    if 0x8000 <= funcx < _FD_HIGH_END else _FD_MISSING)
+            if func_name is None:
                 print("*** formula/tFunc unknown FuncID:%d"
                       % funcx, file=bk.logfile)
                 spush(unk_opnd)
             else:
-                func_name, nargs = func_attrs[:2]
                 if blah:
                     print("    FuncID=%d name=%s nargs=%d"
                           % (funcx, func_name, nargs), file=bk.logfile)
                 assert len(stack) >= nargs
                 if nargs:
                     if nargs > 0:
-                        argtext = listsep.join(arg.text for arg in stack[-nargs:])
+                        argtext = listsep.join([arg.text for arg in stack[-nargs:]])
                     else:
                         argtext = ""
-                    otext = "%s(%s)" % (func_name, argtext)
+                    otext = f"{func_name}({argtext})"
                     if nargs > 0:
                         del stack[-nargs:]
                 else:
@@ -1600,32 +1813,36 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 res = Operand(oUNK, None, FUNC_RANK, otext)
                 spush(res)
         elif opcode == 0x02: #tFuncVar
-            nb = 1 + int(bv >= 40)
-            nargs, funcx = unpack("<B" + " BH"[nb], data[pos+1:pos+2+nb])
+            nargs, funcx = unpack_funcvar(data, pos+1)
             prompt, nargs = divmod(nargs, 128)
             macro, funcx = divmod(funcx, 32768)
             if blah:
                 print("   FuncID=%d nargs=%d macro=%d prompt=%d"
                       % (funcx, nargs, macro, prompt), file=bk.logfile)
-            func_attrs = func_defs.get(funcx, None)
-            if not func_attrs:
+            if funcx < _FD_LOW_SIZE:
+                func_name = _FD_NAME[funcx]
+                minargs = _FD_MIN[funcx]
+                maxargs = _FD_MAX[funcx]
+            else:
+                func_name, minargs, maxargs = (_FD_HIGH[funcx - 0x8000]
+                    if 0x8000 <= funcx < _FD_HIGH_END else _FD_MISSING)
+            if func_name is None:
                 print("*** formula/tFuncVar unknown FuncID:%d"
                       % funcx, file=bk.logfile)
                 spush(unk_opnd)
             else:
-                func_name, minargs, maxargs = func_attrs[:3]
                 if blah:
                     print("    name: %r, min~max args: %d~%d"
                         % (func_name, minargs, maxargs), file=bk.logfile)
                 assert minargs <= nargs <= maxargs
                 assert len(stack) >= nargs
                 assert len(stack) >= nargs
-                argtext = listsep.join(arg.text for arg in stack[-nargs:])
-                otext = "%s(%s)" % (func_name, argtext)
+                argtext = listsep.join([arg.text for arg in stack[-nargs:]])
+                otext = f"{func_name}({argtext})"
                 res = Operand(oUNK, None, FUNC_RANK, otext)
                 if funcx == 1: # IF
                     testarg = stack[-nargs]
-                    if testarg.kind not in (oNUM, oBOOL):
+                    if testarg.kind not in _NUM_OR_BOOL:
                         if blah and testarg.kind != oUNK:
                             print("IF testarg kind?", file=bk.logfile)
                     elif testarg.value not in (0, 1):
@@ -1656,38 +1873,45 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 del stack[-nargs:]
                 spush(res)
         elif opcode == 0x03: #tName
-            tgtnamex = unpack("<H", data[pos+1:pos+3])[0] - 1
+            tgtnamex = _unpack_H(data, pos+1)[0] - 1
             # Only change with BIFF version is number of trailing UNUSED bytes!
             if blah: print("   tgtnamex=%d" % tgtnamex, file=bk.logfile)
-            tgtobj = bk.name_obj_list[tgtnamex]
-            if not tgtobj.evaluated:
-                ### recursive ###
-                evaluate_name_formula(bk, tgtobj, tgtnamex, blah, level+1)
-            if tgtobj.macro or tgtobj.binary or tgtobj.any_err:
-                if blah:
-                    tgtobj.dump(
-                        bk.logfile,
-                        header="!!! tgtobj has problems!!!",
-                        footer="-----------       --------",
-                    )
-                res = Operand(oUNK, None)
-                any_err = any_err or tgtobj.macro or tgtobj.binary or tgtobj.any_err
-                any_rel = any_rel or tgtobj.any_rel
-            else:
-                assert len(tgtobj.stack) == 1
-                res = copy.deepcopy(tgtobj.stack[0])
-            res.rank = LEAF_RANK
-            if tgtobj.scope == -1:
-                res.text = tgtobj.name
+            res = name_operands.get(tgtnamex)
+            if res is not None:
+                res = res.clone()
             else:
-                res.text = "%s!%s" \
-                           % (bk._sheet_names[tgtobj.scope], tgtobj.name)
-            if blah:
-                print("    tName: setting text to", repr(res.text), file=bk.logfile)
+                tgtobj = bk.name_obj_list[tgtnamex]
+                if not tgtobj.evaluated:
+                    ### recursive ###
+                    evaluate_name_formula(bk, tgtobj, tgtnamex, blah, level+1)
+                clean = not (tgtobj.macro or tgtobj.binary or tgtobj.any_err)
+                if not clean:
+                    if blah:
+                        tgtobj.dump(
+                            bk.logfile,
+                            header="!!! tgtobj has problems!!!",
+                            footer="-----------       --------",
+                        )
+                    res = Operand(oUNK, None)
+                    any_err = any_err or tgtobj.macro or tgtobj.binary or tgtobj.any_err
+                    any_rel = any_rel or tgtobj.any_rel
+                else:
+                    assert len(tgtobj.stack) == 1
+                    res = tgtobj.stack[0].clone()
+                res.rank = LEAF_RANK
+                if tgtobj.scope == -1:
+                    res.text = tgtobj.name
+                else:
+                    res.text = "%s!%s" \
+                               % (bk._sheet_names[tgtobj.scope], tgtobj.name)
+                if blah:
+                    print("    tName: setting text to", repr(res.text), file=bk.logfile)
+                if clean:
+                    name_operands[tgtnamex] = res.clone()
             spush(res)
         elif opcode == 0x04: # tRef
-            # not_in_name_formula(op, oname)
-            res = get_cell_addr(data, pos+1, bv, reldelta)
+            # not_in_name_formula(op, onames[opx])
+            res = get_addr(data, pos+1, reldelta)
             if blah: print("  ", res, file=bk.logfile)
             rowx, colx, row_rel, col_rel = res
             shx1 = shx2 = 0 ####### N.B. relative to the CURRENT SHEET
@@ -1697,11 +1921,11 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             res = Operand(oUNK, None)
             if optype == 1:
                 relflags = (1, 1, row_rel, row_rel, col_rel, col_rel)
-                res = Operand(oREL, [Ref3D(coords + relflags)])
+                res = Operand(oREL, [Ref3D(coords, relflags)])
             spush(res)
         elif opcode == 0x05: # tArea
-            # not_in_name_formula(op, oname)
-            res1, res2 = get_cell_range_addr(data, pos+1, bv, reldelta)
+            # not_in_name_formula(op, onames[opx])
+            res1, res2 = get_range_addr(data, pos+1, reldelta)
             if blah: print("  ", res1, res2, file=bk.logfile)
             rowx1, colx1, row_rel1, col_rel1 = res1
             rowx2, colx2, row_rel2, col_rel2 = res2
@@ -1712,35 +1936,35 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             res = Operand(oUNK, None)
             if optype == 1:
                 relflags = (1, 1, row_rel1, row_rel2, col_rel1, col_rel2)
-                res = Operand(oREL, [Ref3D(coords + relflags)])
+                res = Operand(oREL, [Ref3D(coords, relflags)])
             spush(res)
         elif opcode == 0x06: # tMemArea
-            not_in_name_formula(op, oname)
+            not_in_name_formula(op, onames[opx])
         elif opcode == 0x09: # tMemFunc
-            nb = unpack("<H", data[pos+1:pos+3])[0]
+            nb = _unpack_H(data, pos+1)[0]
             if blah: print("  %d bytes of cell ref formula" % nb, file=bk.logfile)
             # no effect on stack
         elif opcode == 0x0C: #tRefN
-            not_in_name_formula(op, oname)
+            not_in_name_formula(op, onames[opx])
             # res = get_cell_addr(data, pos+1, bv, reldelta=1)
             # # note *ALL* tRefN usage has signed offset for relative addresses
             # any_rel = 1
             # if blah: print >> bk.logfile, "   ", res
             # spush(res)
         elif opcode == 0x0D: #tAreaN
-            not_in_name_formula(op, oname)
+            not_in_name_formula(op, onames[opx])
             # res = get_cell_range_addr(data, pos+1, bv, reldelta=1)
             # # note *ALL* tAreaN usage has signed offset for relative addresses
             # any_rel = 1
             # if blah: print >> bk.logfile, "   ", res
         elif opcode == 0x1A: # tRef3d
             if bv >= 80:
-                res = get_cell_addr(data, pos+3, bv, reldelta)
-                refx = unpack("<H", data[pos+1:pos+3])[0]
+                res = get_addr(data, pos+3, reldelta)
+                refx = _unpack_H(data, pos+1)[0]
                 shx1, shx2 = get_externsheet_local_range(bk, refx, blah)
             else:
-                res = get_cell_addr(data, pos+15, bv, reldelta)
-                raw_extshtx, raw_shx1, raw_shx2 = unpack("<hxxxxxxxxhh", data[pos+1:pos+15])
+                res = get_addr(data, pos+15, reldelta)
+                raw_extshtx, raw_shx1, raw_shx2 = _unpack_h8xhh(data, pos+1)
                 if blah:
                     print("tRef3d", raw_extshtx, raw_shx1, raw_shx2, file=bk.logfile)
                 shx1, shx2 = get_externsheet_local_range_b57(
@@ -1754,7 +1978,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             res = Operand(oUNK, None)
             if is_rel:
                 relflags = (0, 0, row_rel, row_rel, col_rel, col_rel)
-                ref3d = Ref3D(coords + relflags)
+                ref3d = Ref3D(coords, relflags)
                 res.kind = oREL
                 res.text = rangename3drel(bk, ref3d, r1c1=1)
             else:
@@ -1767,12 +1991,12 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             spush(res)
         elif opcode == 0x1B: # tArea3d
             if bv >= 80:
-                res1, res2 = get_cell_range_addr(data, pos+3, bv, reldelta)
-                refx = unpack("<H", data[pos+1:pos+3])[0]
+                res1, res2 = get_range_addr(data, pos+3, reldelta)
+                refx = _unpack_H(data, pos+1)[0]
                 shx1, shx2 = get_externsheet_local_range(bk, refx, blah)
             else:
-                res1, res2 = get_cell_range_addr(data, pos+15, bv, reldelta)
-                raw_extshtx, raw_shx1, raw_shx2 = unpack("<hxxxxxxxxhh", data[pos+1:pos+15])
+                res1, res2 = get_range_addr(data, pos+15, reldelta)
+                raw_extshtx, raw_shx1, raw_shx2 = _unpack_h8xhh(data, pos+1)
                 if blah:
                     print("tArea3d", raw_extshtx, raw_shx1, raw_shx2, file=bk.logfile)
                 shx1, shx2 = get_externsheet_local_range_b57(
@@ -1787,7 +2011,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             res = Operand(oUNK, None)
             if is_rel:
                 relflags = (0, 0, row_rel1, row_rel2, col_rel1, col_rel2)
-                ref3d = Ref3D(coords + relflags)
+                ref3d = Ref3D(coords, relflags)
                 res.kind = oREL
                 res.text = rangename3drel(bk, ref3d, r1c1=1)
             else:
@@ -1801,13 +2025,14 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
             spush(res)
         elif opcode == 0x19: # tNameX
             dodgy = 0
+            cacheable = 0
             res = Operand(oUNK, None)
             if bv >= 80:
-                refx, tgtnamex = unpack("<HH", data[pos+1:pos+5])
+                refx, tgtnamex = _unpack_HH(data, pos+1)
                 tgtnamex -= 1
                 origrefx = refx
             else:
-                refx, tgtnamex = unpack("<hxxxxxxxxH", data[pos+1:pos+13])
+                refx, tgtnamex = _unpack_h8xH(data, pos+1)
                 tgtnamex -= 1
                 origrefx = refx
                 if refx > 0:
@@ -1837,12 +2062,15 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                 otext = "<<Name #%d in external(?) file #%d>>" \
                         % (tgtnamex, origrefx)
                 res = Operand(oUNK, None, LEAF_RANK, otext)
+            elif tgtnamex in name_operands:
+                res = name_operands[tgtnamex].clone()
             else:
                 tgtobj = bk.name_obj_list[tgtnamex]
                 if not tgtobj.evaluated:
                     ### recursive ###
                     evaluate_name_formula(bk, tgtobj, tgtnamex, blah, level+1)
-                if tgtobj.macro or tgtobj.binary or tgtobj.any_err:
+                clean = not (tgtobj.macro or tgtobj.binary or tgtobj.any_err)
+                if not clean:
                     if blah:
                         tgtobj.dump(
                             bk.logfile,
@@ -1854,7 +2082,7 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                     any_rel = any_rel or tgtobj.any_rel
                 else:
                     assert len(tgtobj.stack) == 1
-                    res = copy.deepcopy(tgtobj.stack[0])
+                    res = tgtobj.stack[0].clone()
                 res.rank = LEAF_RANK
                 if tgtobj.scope == -1:
                     res.text = tgtobj.name
@@ -1863,13 +2091,15 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
                                % (bk._sheet_names[tgtobj.scope], tgtobj.name)
                 if blah:
                     print("    tNameX: setting text to", repr(res.text), file=bk.logfile)
+                if clean:
+                    name_operands[tgtnamex] = res.clone()
             spush(res)
-        elif opcode in error_opcodes:
+        elif _ERROR_OP_MASK[opcode]:
             any_err = 1
             spush(error_opnd)
         else:
             if blah:
-                print("FORMULA: /// Not handled yet: t" + oname, file=bk.logfile)
+                print("FORMULA: /// Not handled yet: t" + onames[opx], file=bk.logfile)
             any_err = 1
         if sz <= 0:
             raise FormulaError("Fatal: token size is not positive")
@@ -1890,6 +2120,9 @@ def evaluate_name_formula(bk, nobj, namex, blah=0, level=0):
     nobj.any_err = any_err
     nobj.any_external = any_external
     nobj.evaluated = 1
+    if cacheable:
+        bk._name_formula_cache[cache_key] = (
+            [opnd.clone() for opnd in stack], any_rel, any_err, any_external)
 
 #### under construction #############################################################################
 def decompile_formula(bk, fmla, fmlalen,
@@ -1906,7 +2139,9 @@ def decompile_formula(bk, fmla, fmlalen,
         hex_char_dump(data, 0, fmlalen, fout=bk.logfile)
     if level > STACK_PANIC_LEVEL:
         raise XLRDError("Excessive indirect references in formula")
-    sztab = szdict[bv]
+    preamble = _TOKEN_PREAMBLE[bv]
+    unpack_func, unpack_funcvar = _FUNC_TOKEN_UNPACKERS[bv >= 40]
+    get_addr, get_range_addr = _CELL_ADDR_READERS[bv >= 80]
     pos = 0
     stack = []
     any_rel = 0
@@ -1915,20 +2150,13 @@ def decompile_formula(bk, fmla, fmlalen,
     error_opnd = Operand(oERR, None)
     spush = stack.append
 
-    def do_binop(opcd, stk):
+    def do_binop(binopx, stk):
         assert len(stk) >= 2
         bop = stk.pop()
         aop = stk.pop()
-        argdict, result_kind, func, rank, sym = binop_rules[opcd]
-        otext = ''.join([
-            '('[:aop.rank <= rank],
-            aop.text,
-            ')'[:aop.rank <= rank],
-            sym,
-            '('[:bop.rank <= rank],
-            bop.text,
-            ')'[:bop.rank <= rank],
-        ])
+        argdict, result_kind, func, rank, sym = _BINOP_RULES[binopx]
+        # operands of equal rank are parenthesised too
+        otext = _binop_text(aop, sym, bop, rank + 1)
         resop = Operand(result_kind, None, rank, otext)
         stk.append(resop)
 
@@ -1936,18 +2164,12 @@ def decompile_formula(bk, fmla, fmlalen,
         assert len(stk) >= 1
         aop = stk.pop()
         func, rank, sym1, sym2 = unop_rules[opcode]
-        otext = ''.join([
-            sym1,
-            '('[:aop.rank < rank],
-            aop.text,
-            ')'[:aop.rank < rank],
-            sym2,
-        ])
+        otext = _unop_text(sym1, aop, sym2, rank)
         stk.append(Operand(result_kind, None, rank, otext))
 
     def unexpected_opcode(op_arg, oname_arg):
         msg = "ERROR *** Unexpected token 0x%02x (%s) found in formula type %s" \
-              % (op_arg, oname_arg, FMLA_TYPEDESCR_MAP[fmlatype])
+              % (op_arg, oname_arg, _FMLA_TYPEDESCR_TUP[fmlatype.bit_length() - 1])
         print(msg, file=bk.logfile)
         # raise FormulaError(msg)
 
@@ -1955,42 +2177,34 @@ def decompile_formula(bk, fmla, fmlalen,
         stack = [unk_opnd]
 
     while 0 <= pos < fmlalen:
-        op = BYTES_ORD(data[pos])
-        opcode = op & 0x1f
-        optype = (op & 0x60) >> 5
-        if optype:
-            opx = opcode + 32
-        else:
-            opx = opcode
-        oname = onames[opx] # + [" RVA"][optype]
-        sz = sztab[opx]
+        op = data[pos]
+        opcode, optype, opx, sz = preamble[op]
         if blah:
             print("Pos:%d Op:0x%02x opname:t%s Sz:%d opcode:%02xh optype:%02xh"
-                % (pos, op, oname, sz, opcode, optype), file=bk.logfile)
+                % (pos, op, onames[opx], sz, opcode, optype), file=bk.logfile)
             print("Stack =", stack, file=bk.logfile)
         if sz == -2:
             msg = 'ERROR *** Unexpected token 0x%02x ("%s"); biff_version=%d' \
-                % (op, oname, bv)
+                % (op, onames[opx], bv)
             raise FormulaError(msg)
-        if _TOKEN_NOT_ALLOWED(opx, 0) & fmlatype:
-            unexpected_opcode(op, oname)
+        if _TOKEN_NOT_ALLOWED_TBL[opx] & fmlatype:
+            unexpected_opcode(op, onames[opx])
         if not optype:
             if opcode <= 0x01: # tExp
+                assert pos == 0 and fmlalen == sz and not stack
                 if bv >= 30:
-                    fmt = '<x2H'
+                    rowx, colx = _unpack_HH(data, 1)
                 else:
-                    fmt = '<xHB'
-                assert pos == 0 and fmlalen == sz and not stack
-                rowx, colx = unpack(fmt, data)
+                    rowx, colx = _unpack_HB(data, 1)
                 text = "SHARED FMLA at rowx=%d colx=%d" % (rowx, colx)
                 spush(Operand(oUNK, None, LEAF_RANK, text))
                 if not fmlatype & (FMLA_TYPE_CELL | FMLA_TYPE_ARRAY):
-                    unexpected_opcode(op, oname)
+                    unexpected_opcode(op, onames[opx])
             elif 0x03 <= opcode <= 0x0E:
                 # Add, Sub, Mul, Div, Power
                 # tConcat
                 # tLT, ..., tNE
-                do_binop(opcode, stack)
+                do_binop(opcode - 0x03, stack)
             elif opcode == 0x0F: # tIsect
                 if blah: print("tIsect pre", stack, file=bk.logfile)
                 assert len(stack) >= 2
@@ -1998,15 +2212,7 @@ def decompile_formula(bk, fmla, fmlalen,
                 aop = stack.pop()
                 sym = ' '
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF)
                 res.text = otext
                 if bop.kind == oERR or aop.kind == oERR:
@@ -2034,15 +2240,7 @@ def decompile_formula(bk, fmla, fmlalen,
                 aop = stack.pop()
                 sym = ','
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF, None, rank, otext)
                 if bop.kind == oERR or aop.kind == oERR:
                     res.kind = oERR
@@ -2061,15 +2259,7 @@ def decompile_formula(bk, fmla, fmlalen,
                 aop = stack.pop()
                 sym = ':'
                 rank = 80 ########## check #######
-                otext = ''.join([
-                    '('[:aop.rank < rank],
-                    aop.text,
-                    ')'[:aop.rank < rank],
-                    sym,
-                    '('[:bop.rank < rank],
-                    bop.text,
-                    ')'[:bop.rank < rank],
-                ])
+                otext = _binop_text(aop, sym, bop, rank)
                 res = Operand(oREF, None, rank, otext)
                 if bop.kind == oERR or aop.kind == oERR:
                     res = oERR
@@ -2103,8 +2293,8 @@ def decompile_formula(bk, fmla, fmlalen,
                 # not in OOo docs, don't even know how to determine its length
                 raise FormulaError("tExtended token not implemented")
             elif opcode == 0x19: # tAttr
-                subop, nc = unpack("<BH", data[pos+1:pos+4])
-                subname = tAttrNames.get(subop, "??Unknown??")
+                subop, nc = _unpack_BH(data, pos+1)
+                subname = _TATTR_NAMES[subop]
                 if subop == 0x04: # Choose
                     sz = nc * 2 + 6
                 elif subop == 0x10: # Sum (single arg)
@@ -2124,9 +2314,8 @@ def decompile_formula(bk, fmla, fmlalen,
                 raise FormulaError("tSheet & tEndsheet tokens not implemented")
             elif 0x1C <= opcode <= 0x1F: # tErr, tBool, tInt, tNum
                 inx = opcode - 0x1C
-                nb = [1, 1, 2, 8][inx]
-                kind = [oERR, oBOOL, oNUM, oNUM][inx]
-                value, = unpack("<" + "BBHd"[inx], data[pos+1:pos+1+nb])
+                kind, unpack_value = _CONST_TOKENS[inx]
+                value, = unpack_value(data, pos+1)
                 if inx == 2: # tInt
                     value = float(value)
                     text = str(value)
@@ -2135,7 +2324,7 @@ def decompile_formula(bk, fmla, fmlalen,
                 elif inx == 1: # tBool
                     text = ('FALSE', 'TRUE')[value]
                 else:
-                    text = '"' +error_text_from_code[value] + '"'
+                    text = _ERROR_TOKEN_TEXT[value]
                 spush(Operand(kind, None, LEAF_RANK, text))
             else:
                 raise FormulaError("Unhandled opcode: 0x%02x" % opcode)
@@ -2146,24 +2335,27 @@ def decompile_formula(bk, fmla, fmlalen,
         if opcode == 0x00: # tArray
             spush(unk_opnd)
         elif opcode == 0x01: # tFunc
-            nb = 1 + int(bv >= 40)
-            funcx = unpack("<" + " BH"[nb], data[pos+1:pos+1+nb])[0]
-            func_attrs = func_defs.get(funcx, None)
-            if not func_attrs:
+            funcx = unpack_func(data, pos+1)[0]
+            if funcx < _FD_LOW_SIZE:
+                func_name = _FD_NAME[funcx]
+                nargs = _FD_MIN[funcx]
+            else:
+                func_name, nargs, _ = (_FD_HIGH[funcx - 0x8000]
+                    if 0x8000 <= funcx < _FD_HIGH_END else _FD_MISSING)
+            if func_name is None:
                 print("*** formula/tFunc unknown FuncID:%d" % funcx, file=bk.logfile)
                 spush(unk_opnd)
             else:
-                func_name, nargs = func_attrs[:2]
                 if blah:
                     print("    FuncID=%d name=%s nargs=%d"
                           % (funcx, func_name, nargs), file=bk.logfile)
                 assert len(stack) >= nargs
                 if nargs:
                     if nargs>0:
-                        argtext = listsep.join(arg.text for arg in stack[-nargs:])
+                        argtext = listsep.join([arg.text for arg in stack[-nargs:]])
                     else:
                         argtext = ""
-                    otext = "%s(%s)" % (func_name, argtext)
+                    otext = f"{func_name}({argtext})"
                     if nargs > 0:
                         del stack[-nargs:]
                 else:
@@ -2171,8 +2363,7 @@ def decompile_formula(bk, fmla, fmlalen,
                 res = Operand(oUNK, None, FUNC_RANK, otext)
                 spush(res)
         elif opcode == 0x02: #tFuncVar
-            nb = 1 + int(bv >= 40)
-            nargs, funcx_val = unpack("<B" + " BH"[nb], data[pos+1:pos+2+nb])
+            nargs, funcx_val = unpack_funcvar(data, pos+1)
             prompt, nargs = divmod(nargs, 128)
             macro, funcx = divmod(funcx_val, 32768)
             if blah:
@@ -2199,7 +2390,14 @@ def decompile_formula(bk, fmla, fmlalen,
                 else:
                     func_attrs = ("CALL_ADDIN", 1, 30)
             else:
-                func_attrs = func_defs.get(funcx_val, None)
+                if funcx_val < _FD_LOW_SIZE:
+                    func_attrs = (_FD_NAME[funcx_val], _FD_MIN[funcx_val],
+                                  _FD_MAX[funcx_val])
+                else:
+                    func_attrs = (_FD_HIGH[funcx_val - 0x8000]
+                        if 0x8000 <= funcx_val < _FD_HIGH_END else _FD_MISSING)
+                if func_attrs[0] is None:
+                    func_attrs = None
             if not func_attrs:
                 print("*** formula/tFuncVar unknown FuncID:%d"
                       % funcx, file=bk.logfile)
@@ -2213,16 +2411,16 @@ def decompile_formula(bk, fmla, fmlalen,
                 assert len(stack) >= nargs
                 assert len(stack) >= nargs
                 if nargs>0:
-                    argtext = listsep.join(arg.text for arg in stack[-nargs:])
+                    argtext = listsep.join([arg.text for arg in stack[-nargs:]])
                 else:
                     argtext = ""
-                otext = "%s(%s)" % (func_name, argtext)
+                otext = f"{func_name}({argtext})"
                 res = Operand(oUNK, None, FUNC_RANK, otext)
                 if nargs > 0:
                     del stack[-nargs:]
                 spush(res)
         elif opcode == 0x03: #tName
-            tgtnamex = unpack("<H", data[pos+1:pos+3])[0] - 1
+            tgtnamex = _unpack_H(data, pos+1)[0] - 1
             # Only change with BIFF version is number of trailing UNUSED bytes!
             if blah: print("   tgtnamex=%d" % tgtnamex, file=bk.logfile)
             tgtobj = bk.name_obj_list[tgtnamex]
@@ -2235,7 +2433,7 @@ def decompile_formula(bk, fmla, fmlalen,
             res = Operand(oUNK, None, LEAF_RANK, otext)
             spush(res)
         elif opcode == 0x04: # tRef
-            res = get_cell_addr(data, pos+1, bv, reldelta, browx, bcolx)
+            res = get_addr(data, pos+1, reldelta, browx, bcolx)
             if blah: print("  ", res, file=bk.logfile)
             rowx, colx, row_rel, col_rel = res
             is_rel = row_rel or col_rel
@@ -2247,14 +2445,14 @@ def decompile_formula(bk, fmla, fmlalen,
             res = Operand(okind, None, LEAF_RANK, otext)
             spush(res)
         elif opcode == 0x05: # tArea
-            res1, res2 = get_cell_range_addr(
-                            data, pos+1, bv, reldelta, browx, bcolx)
+            res1, res2 = get_range_addr(
+                            data, pos+1, reldelta, browx, bcolx)
             if blah: print("  ", res1, res2, file=bk.logfile)
             rowx1, colx1, row_rel1, col_rel1 = res1
             rowx2, colx2, row_rel2, col_rel2 = res2
             coords = (rowx1, rowx2+1, colx1, colx2+1)
             relflags = (row_rel1, row_rel2, col_rel1, col_rel2)
-            if sum(relflags):  # relative
+            if row_rel1 or row_rel2 or col_rel1 or col_rel2:  # relative
                 okind = oREL
             else:
                 okind = oREF
@@ -2264,13 +2462,13 @@ def decompile_formula(bk, fmla, fmlalen,
             spush(res)
         elif opcode == 0x06: # tMemArea
             pass
-            # not_in_name_formula(op, oname)
+            # not_in_name_formula(op, onames[opx])
         elif opcode == 0x09: # tMemFunc
-            nb = unpack("<H", data[pos+1:pos+3])[0]
+            nb = _unpack_H(data, pos+1)[0]
             if blah: print("  %d bytes of cell ref formula" % nb, file=bk.logfile)
             # no effect on stack
         elif opcode == 0x0C: #tRefN
-            res = get_cell_addr(data, pos+1, bv, reldelta, browx, bcolx)
+            res = get_addr(data, pos+1, reldelta, browx, bcolx)
             # note *ALL* tRefN usage has signed offset for relative addresses
             any_rel = 1
             if blah: print("   ", res, file=bk.logfile)
@@ -2288,14 +2486,14 @@ def decompile_formula(bk, fmla, fmlalen,
             # # note *ALL* tAreaN usage has signed offset for relative addresses
             # any_rel = 1
             # if blah: print >> bk.logfile, "   ", res
-            res1, res2 = get_cell_range_addr(
-                            data, pos+1, bv, reldelta, browx, bcolx)
+            res1, res2 = get_range_addr(
+                            data, pos+1, reldelta, browx, bcolx)
             if blah: print("  ", res1, res2, file=bk.logfile)
             rowx1, colx1, row_rel1, col_rel1 = res1
             rowx2, colx2, row_rel2, col_rel2 = res2
             coords = (rowx1, rowx2+1, colx1, colx2+1)
             relflags = (row_rel1, row_rel2, col_rel1, col_rel2)
-            if sum(relflags):  # relative
+            if row_rel1 or row_rel2 or col_rel1 or col_rel2:  # relative
                 okind = oREL
             else:
                 okind = oREF
@@ -2305,12 +2503,12 @@ def decompile_formula(bk, fmla, fmlalen,
             spush(res)
         elif opcode == 0x1A: # tRef3d
             if bv >= 80:
-                res = get_cell_addr(data, pos+3, bv, reldelta, browx, bcolx)
-                refx = unpack("<H", data[pos+1:pos+3])[0]
+                res = get_addr(data, pos+3, reldelta, browx, bcolx)
+                refx = _unpack_H(data, pos+1)[0]
                 shx1, shx2 = get_externsheet_local_range(bk, refx, blah)
             else:
-                res = get_cell_addr(data, pos+15, bv, reldelta, browx, bcolx)
-                raw_extshtx, raw_shx1, raw_shx2 = unpack("<hxxxxxxxxhh", data[pos+1:pos+15])
+                res = get_addr(data, pos+15, reldelta, browx, bcolx)
+                raw_extshtx, raw_shx1, raw_shx2 = _unpack_h8xhh(data, pos+1)
                 if blah:
                     print("tRef3d", raw_extshtx, raw_shx1, raw_shx2, file=bk.logfile)
                 shx1, shx2 = get_externsheet_local_range_b57(
@@ -2324,7 +2522,7 @@ def decompile_formula(bk, fmla, fmlalen,
             res = Operand(oUNK, None)
             if is_rel:
                 relflags = (0, 0, row_rel, row_rel, col_rel, col_rel)
-                ref3d = Ref3D(coords + relflags)
+                ref3d = Ref3D(coords, relflags)
                 res.kind = oREL
                 res.text = rangename3drel(bk, ref3d, browx, bcolx, r1c1)
             else:
@@ -2336,12 +2534,12 @@ def decompile_formula(bk, fmla, fmlalen,
             spush(res)
         elif opcode == 0x1B: # tArea3d
             if bv >= 80:
-                res1, res2 = get_cell_range_addr(data, pos+3, bv, reldelta)
-                refx = unpack("<H", data[pos+1:pos+3])[0]
+                res1, res2 = get_range_addr(data, pos+3, reldelta)
+                refx = _unpack_H(data, pos+1)[0]
                 shx1, shx2 = get_externsheet_local_range(bk, refx, blah)
             else:
-                res1, res2 = get_cell_range_addr(data, pos+15, bv, reldelta)
-                raw_extshtx, raw_shx1, raw_shx2 = unpack("<hxxxxxxxxhh", data[pos+1:pos+15])
+                res1, res2 = get_range_addr(data, pos+15, reldelta)
+                raw_extshtx, raw_shx1, raw_shx2 = _unpack_h8xhh(data, pos+1)
                 if blah:
                     print("tArea3d", raw_extshtx, raw_shx1, raw_shx2, file=bk.logfile)
                 shx1, shx2 = get_externsheet_local_range_b57(
@@ -2356,7 +2554,7 @@ def decompile_formula(bk, fmla, fmlalen,
             res = Operand(oUNK, None)
             if is_rel and sheet_id == coords[0]:
                 relflags = (0, 0, row_rel1, row_rel2, col_rel1, col_rel2)
-                ref3d = Ref3D(coords + relflags)
+                ref3d = Ref3D(coords, relflags)
                 res.kind = oREL
                 res.text = rangename3drel(bk, ref3d, browx, bcolx, r1c1)
             else:
@@ -2369,11 +2567,11 @@ def decompile_formula(bk, fmla, fmlalen,
             dodgy = 0
             res = Operand(oUNK, None)
             if bv >= 80:
-                refx, tgtnamex = unpack("<HH", data[pos+1:pos+5])
+                refx, tgtnamex = _unpack_HH(data, pos+1)
                 tgtnamex -= 1
                 origrefx = refx
             else:
-                refx, tgtnamex = unpack("<hxxxxxxxxH", data[pos+1:pos+13])
+                refx, tgtnamex = _unpack_h8xH(data, pos+1)
                 tgtnamex -= 1
                 origrefx = refx
                 if refx > 0:
@@ -2419,12 +2617,12 @@ def decompile_formula(bk, fmla, fmlalen,
                     print("    tNameX: setting text to", repr(res.text), file=bk.logfile)
             res = Operand(okind, ovalue, LEAF_RANK, otext)
             spush(res)
-        elif opcode in error_opcodes:
+        elif _ERROR_OP_MASK[opcode]:
             any_err = 1
             spush(error_opnd)
         else:
             if blah:
-                print("FORMULA: /// Not handled yet: t" + oname, file=bk.logfile)
+                print("FORMULA: /// Not handled yet: t" + onames[opx], file=bk.logfile)
             any_err = 1
         if sz <= 0:
             raise FormulaError("Fatal: token size is not positive")
@@ -2449,30 +2647,24 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
         print("dump_formula", fmlalen, bv, len(data), file=bk.logfile)
         hex_char_dump(data, 0, fmlalen, fout=bk.logfile)
     assert bv >= 80 #### this function needs updating ####
-    sztab = szdict[bv]
+    preamble = _TOKEN_PREAMBLE[bv]
+    unpack_func, unpack_funcvar = _FUNC_TOKEN_UNPACKERS[bv >= 40]
+    get_addr, get_range_addr = _CELL_ADDR_READERS[bv >= 80]
     pos = 0
     stack = []
     any_rel = 0
     any_err = 0
     spush = stack.append
     while 0 <= pos < fmlalen:
-        op = BYTES_ORD(data[pos])
-        opcode = op & 0x1f
-        optype = (op & 0x60) >> 5
-        if optype:
-            opx = opcode + 32
-        else:
-            opx = opcode
-        oname = onames[opx] # + [" RVA"][optype]
-
-        sz = sztab[opx]
+        op = data[pos]
+        opcode, optype, opx, sz = preamble[op]
         if blah:
             print("Pos:%d Op:0x%02x Name:t%s Sz:%d opcode:%02xh optype:%02xh"
-                % (pos, op, oname, sz, opcode, optype), file=bk.logfile)
+                % (pos, op, onames[opx], sz, opcode, optype), file=bk.logfile)
         if not optype:
             if 0x01 <= opcode <= 0x02: # tExp, tTbl
                 # reference to a shared formula or table record
-                rowx, colx = unpack("<HH", data[pos+1:pos+5])
+                rowx, colx = _unpack_HH(data, pos+1)
                 if blah: print("  ", (rowx, colx), file=bk.logfile)
             elif opcode == 0x10: # tList
                 if blah: print("tList pre", stack, file=bk.logfile)
@@ -2488,7 +2680,7 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
                 aop = stack.pop()
                 assert len(aop) == 1
                 assert len(bop) == 1
-                result = do_box_funcs(tRangeFuncs, aop[0], bop[0])
+                result = _range_coords(aop[0], bop[0])
                 spush(result)
                 if blah: print("tRange post", stack, file=bk.logfile)
             elif opcode == 0x0F: # tIsect
@@ -2498,12 +2690,12 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
                 aop = stack.pop()
                 assert len(aop) == 1
                 assert len(bop) == 1
-                result = do_box_funcs(tIsectFuncs, aop[0], bop[0])
+                result = _isect_coords(aop[0], bop[0])
                 spush(result)
                 if blah: print("tIsect post", stack, file=bk.logfile)
             elif opcode == 0x19: # tAttr
-                subop, nc = unpack("<BH", data[pos+1:pos+4])
-                subname = tAttrNames.get(subop, "??Unknown??")
+                subop, nc = _unpack_BH(data, pos+1)
+                subname = _TATTR_NAMES[subop]
                 if subop == 0x04: # Choose
                     sz = nc * 2 + 6
                 else:
@@ -2511,7 +2703,7 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
                 if blah: print("   subop=%02xh subname=t%s sz=%d nc=%02xh" % (subop, subname, sz, nc), file=bk.logfile)
             elif opcode == 0x17: # tStr
                 if bv <= 70:
-                    nc = BYTES_ORD(data[pos+1])
+                    nc = data[pos+1]
                     strg = data[pos+2:pos+2+nc] # left in 8-bit encoding
                     sz = nc + 2
                 else:
@@ -2527,41 +2719,39 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
         if opcode == 0x00: # tArray
             pass
         elif opcode == 0x01: # tFunc
-            nb = 1 + int(bv >= 40)
-            funcx = unpack("<" + " BH"[nb], data[pos+1:pos+1+nb])
+            funcx = unpack_func(data, pos+1)
             if blah: print("   FuncID=%d" % funcx, file=bk.logfile)
         elif opcode == 0x02: #tFuncVar
-            nb = 1 + int(bv >= 40)
-            nargs, funcx = unpack("<B" + " BH"[nb], data[pos+1:pos+2+nb])
+            nargs, funcx = unpack_funcvar(data, pos+1)
             prompt, nargs = divmod(nargs, 128)
             macro, funcx = divmod(funcx, 32768)
             if blah: print("   FuncID=%d nargs=%d macro=%d prompt=%d" % (funcx, nargs, macro, prompt), file=bk.logfile)
         elif opcode == 0x03: #tName
-            namex = unpack("<H", data[pos+1:pos+3])
+            namex = _unpack_H(data, pos+1)
             # Only change with BIFF version is the number of trailing UNUSED bytes!!!
             if blah: print("   namex=%d" % namex, file=bk.logfile)
         elif opcode == 0x04: # tRef
-            res = get_cell_addr(data, pos+1, bv, reldelta)
+            res = get_addr(data, pos+1, reldelta)
             if blah: print("  ", res, file=bk.logfile)
         elif opcode == 0x05: # tArea
-            res = get_cell_range_addr(data, pos+1, bv, reldelta)
+            res = get_range_addr(data, pos+1, reldelta)
             if blah: print("  ", res, file=bk.logfile)
         elif opcode == 0x09: # tMemFunc
-            nb = unpack("<H", data[pos+1:pos+3])[0]
+            nb = _unpack_H(data, pos+1)[0]
             if blah: print("  %d bytes of cell ref formula" % nb, file=bk.logfile)
         elif opcode == 0x0C: #tRefN
-            res = get_cell_addr(data, pos+1, bv, reldelta=1)
+            res = get_addr(data, pos+1, reldelta=1)
             # note *ALL* tRefN usage has signed offset for relative addresses
             any_rel = 1
             if blah: print("   ", res, file=bk.logfile)
         elif opcode == 0x0D: #tAreaN
-            res = get_cell_range_addr(data, pos+1, bv, reldelta=1)
+            res = get_range_addr(data, pos+1, reldelta=1)
             # note *ALL* tAreaN usage has signed offset for relative addresses
             any_rel = 1
             if blah: print("   ", res, file=bk.logfile)
         elif opcode == 0x1A: # tRef3d
-            refx = unpack("<H", data[pos+1:pos+3])[0]
-            res = get_cell_addr(data, pos+3, bv, reldelta)
+            refx = _unpack_H(data, pos+1)[0]
+            res = get_addr(data, pos+3, reldelta)
             if blah: print("  ", refx, res, file=bk.logfile)
             rowx, colx, row_rel, col_rel = res
             any_rel = any_rel or row_rel or col_rel
@@ -2571,8 +2761,8 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
             if blah: print("   ", coords, file=bk.logfile)
             if optype == 1: spush([coords])
         elif opcode == 0x1B: # tArea3d
-            refx = unpack("<H", data[pos+1:pos+3])[0]
-            res1, res2 = get_cell_range_addr(data, pos+3, bv, reldelta)
+            refx = _unpack_H(data, pos+1)[0]
+            res1, res2 = get_range_addr(data, pos+3, reldelta)
             if blah: print("  ", refx, res1, res2, file=bk.logfile)
             rowx1, colx1, row_rel1, col_rel1 = res1
             rowx2, colx2, row_rel2, col_rel2 = res2
@@ -2583,12 +2773,12 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
             if blah: print("   ", coords, file=bk.logfile)
             if optype == 1: spush([coords])
         elif opcode == 0x19: # tNameX
-            refx, namex = unpack("<HH", data[pos+1:pos+5])
+            refx, namex = _unpack_HH(data, pos+1)
             if blah: print("   refx=%d namex=%d" % (refx, namex), file=bk.logfile)
-        elif opcode in error_opcodes:
+        elif _ERROR_OP_MASK[opcode]:
             any_err = 1
         else:
-            if blah: print("FORMULA: /// Not handled yet: t" + oname, file=bk.logfile)
+            if blah: print("FORMULA: /// Not handled yet: t" + onames[opx], file=bk.logfile)
             any_err = 1
         if sz <= 0:
             print("**** Dud size; exiting ****", file=bk.logfile)
@@ -2608,19 +2798,27 @@ def dump_formula(bk, data, fmlalen, bv, reldelta, blah=0, isname=0):
 # relative flags of (1, 1, ...). These functions display the
 # sheet component as empty, just like Excel etc.
 
+# R1C1 relative row and column offsets, "R[-1]" / "C[2]", filled in on
+# first use.
+_R1C1_ROW_OFFSETS = {}
+_R1C1_COL_OFFSETS = {}
+
 def rownamerel(rowx, rowxrel, browx=None, r1c1=0):
     # if no base rowx is provided, we have to return r1c1
     if browx is None:
         r1c1 = True
     if not rowxrel:
         if r1c1:
-            return "R%d" % (rowx+1)
-        return "$%d" % (rowx+1)
+            return f"R{rowx + 1}"
+        return f"${rowx + 1}"
     if r1c1:
         if rowx:
-            return "R[%d]" % rowx
+            name = _R1C1_ROW_OFFSETS.get(rowx)
+            if name is None:
+                name = _R1C1_ROW_OFFSETS[rowx] = f"R[{rowx}]"
+            return name
         return "R"
-    return "%d" % ((browx + rowx) % 65536 + 1)
+    return str((browx + rowx) % 65536 + 1)
 
 def colnamerel(colx, colxrel, bcolx=None, r1c1=0):
     # if no base colx is provided, we have to return r1c1
@@ -2628,23 +2826,28 @@ def colnamerel(colx, colxrel, bcolx=None, r1c1=0):
         r1c1 = True
     if not colxrel:
         if r1c1:
-            return "C%d" % (colx + 1)
+            return f"C{colx + 1}"
         return "$" + colname(colx)
     if r1c1:
         if colx:
-            return "C[%d]" % colx
+            name = _R1C1_COL_OFFSETS.get(colx)
+            if name is None:
+                name = _R1C1_COL_OFFSETS[colx] = f"C[{colx}]"
+            return name
         return "C"
     return colname((bcolx + colx) % 256)
 
+@functools.lru_cache(maxsize=8192)
 def cellname(rowx, colx):
     """Utility function: ``(5, 7)`` => ``'H6'``"""
-    return "%s%d" % (colname(colx), rowx+1)
+    return f"{colname(colx)}{rowx + 1}"
 
+@functools.lru_cache(maxsize=8192)
 def cellnameabs(rowx, colx, r1c1=0):
     """Utility function: ``(5, 7)`` => ``'$H$6'``"""
     if r1c1:
-        return "R%dC%d" % (rowx+1, colx+1)
-    return "$%s$%d" % (colname(colx), rowx+1)
+        return f"R{rowx + 1}C{colx + 1}"
+    return f"${colname(colx)}${rowx + 1}"
 
 def cellnamerel(rowx, colx, rowxrel, colxrel, browx=None, bcolx=None, r1c1=0):
     if not rowxrel and not colxrel:
@@ -2658,14 +2861,32 @@ def cellnamerel(rowx, colx, rowxrel, colxrel, browx=None, bcolx=None, r1c1=0):
         return r + c
     return c + r
 
+# colname() results, filled in on first use; one slot per column of an
+# Excel 2007+ sheet (16384 columns).
+_COLNAME_CACHE = [None] * 16384
+
 def colname(colx):
     """Utility function: ``7`` => ``'H'``, ``27`` => ``'AB'``"""
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    if colx <= 25:
-        return alphabet[colx]
-    else:
-        xdiv26, xmod26 = divmod(colx, 26)
-        return alphabet[xdiv26 - 1] + alphabet[xmod26]
+    if 0 <= colx < 16384:
+        c = _COLNAME_CACHE[colx]
+        if c is None:
+            c = _COLNAME_CACHE[colx] = _compute_colname(colx)
+        return c
+    return _compute_colname(colx)
+
+_ALPHA = [chr(65 + i) for i in range(26)]
+# 'AA' .. 'ZZ', i.e. the names of columns 26 .. 701
+_ALPHA2 = [a + b for a in _ALPHA for b in _ALPHA]
+
+def _compute_colname(colx):
+    if colx < 26:
+        return _ALPHA[colx]
+    if colx < 702:
+        return _ALPHA2[colx - 26]
+    # 'AAA' .. 'XFD'
+    a, lo = divmod(colx - 702, 26)
+    hi, mid = divmod(a, 26)
+    return _ALPHA[hi] + _ALPHA[mid] + _ALPHA[lo]
 
 def rangename2d(rlo, rhi, clo, chi, r1c1=0):
     """ ``(5, 20, 7, 10)`` => ``'$H$6:$J$20'`` """
@@ -2673,7 +2894,7 @@ def rangename2d(rlo, rhi, clo, chi, r1c1=0):
         return
     if rhi == rlo+1 and chi == clo+1:
         return cellnameabs(rlo, clo, r1c1)
-    return "%s:%s" % (cellnameabs(rlo, clo, r1c1), cellnameabs(rhi-1, chi-1, r1c1))
+    return f"{cellnameabs(rlo, clo, r1c1)}:{cellnameabs(rhi-1, chi-1, r1c1)}"
 
 def rangename2drel(rlo_rhi_clo_chi, rlorel_rhirel_clorel_chirel, browx=None, bcolx=None, r1c1=0):
     rlo, rhi, clo, chi = rlo_rhi_clo_chi
@@ -2685,12 +2906,8 @@ def rangename2drel(rlo_rhi_clo_chi, rlorel_rhirel_clorel_chirel, browx=None, bco
     start_cell = cellnamerel(rlo, clo, rlorel, clorel, browx, bcolx, r1c1)
     end_cell = cellnamerel(rhi - 1, chi - 1, rhirel, chirel, browx, bcolx, r1c1)
     if start_cell == end_cell:
-        return str(start_cell)
-    else:
-        return "%s:%s" % (
-            cellnamerel(rlo, clo, rlorel, clorel, browx, bcolx, r1c1),
-            cellnamerel(rhi - 1, chi - 1, rhirel, chirel, browx, bcolx, r1c1),
-        )
+        return start_cell
+    return f"{start_cell}:{end_cell}"
 
 
 def rangename3d(book, ref3d):
@@ -2701,9 +2918,7 @@ def rangename3d(book, ref3d):
     (assuming Excel's default sheetnames)
     """
     coords = ref3d.coords
-    return "%s!%s" % (
-        sheetrange(book, *coords[:2]),
-        rangename2d(*coords[2:6]))
+    return f"{sheetrange(book, *coords[:2])}!{rangename2d(*coords[2:6])}"
 
 def rangename3drel(book, ref3d, browx=None, bcolx=None, r1c1=0):
     """
@@ -2720,29 +2935,41 @@ def rangename3drel(book, ref3d, browx=None, bcolx=None, r1c1=0):
     rngdesc = rangename2drel(coords[2:6], relflags[2:6], browx, bcolx, r1c1)
     if not shdesc:
         return rngdesc
-    return "%s!%s" % (shdesc, rngdesc)
+    return f"{shdesc}!{rngdesc}"
+
+_SPECIAL_SHEET_NAMES = {
+    -1: "?internal; any sheet?",
+    -2: "internal; deleted sheet",
+    -3: "internal; macro sheet",
+    -4: "<<external>>",
+}
 
 def quotedsheetname(shnames, shx):
     if shx >= 0:
         shname = shnames[shx]
     else:
-        shname = {
-            -1: "?internal; any sheet?",
-            -2: "internal; deleted sheet",
-            -3: "internal; macro sheet",
-            -4: "<<external>>",
-        }.get(shx, "?error %d?" % shx)
+        shname = _SPECIAL_SHEET_NAMES.get(shx)
+        if shname is None:
+            shname = f"?error {shx}?"
     # if "'" in shname:
     #     return "'" + shname.replace("'", "''") + "'"
     # if " " in shname:
     #     return "'" + shname + "'"
     return "'" + shname + "'"
 
+def _quoted_sheet_name(book, shx):
+    # Sheet names don't change once read, so each quoted name is built once
+    # per workbook.
+    cache = book._quoted_sheet_names
+    name = cache.get(shx)
+    if name is None:
+        name = cache[shx] = quotedsheetname(book.sheet_names(), shx)
+    return name
+
 def sheetrange(book, slo, shi):
-    shnames = book.sheet_names()
-    shdesc = quotedsheetname(shnames, slo)
+    shdesc = _quoted_sheet_name(book, slo)
     if slo != shi-1:
-        shdesc += ":" + quotedsheetname(shnames, shi-1)
+        shdesc += ":" + _quoted_sheet_name(book, shi-1)
     return shdesc
 
 def sheetrangerel(book, srange, srangerel):
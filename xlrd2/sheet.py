@@ -408,6 +408,8 @@ class Sheet(BaseObject):
         # self._put_cell_cells_appended = 0
 
         self.used_cells = set()
+        # (rowx, colx) -> formula text, for cells that carry a formula
+        self.formula_map = {}
 
     def cell(self, rowx, colx):
         """
@@ -491,13 +493,38 @@ class Sheet(BaseObject):
 
     def get_used_cells(self):
         """
-        Returns a sequence of the :class:`Cell` objects in the given row.
+        Returns a sequence of the :class:`Cell` objects for every cell that
+        was written to this sheet.
         """
+        cell_types = self._cell_types
+        cell_values = self._cell_values
+        cell_formulas = self._cell_formulas
+        if self.formatting_info:
+            cell_xf_index = self.cell_xf_index
+        else:
+            cell_xf_index = lambda rowx, colx: None
         return [
-            self.cell(rowx, colx)
+            Cell(
+                rowx,
+                colx,
+                cell_types[rowx][colx],
+                cell_values[rowx][colx],
+                cell_formulas[rowx][colx],
+                cell_xf_index(rowx, colx),
+            )
             for rowx, colx in self.used_cells
         ]
 
+    def iter_formula_cells(self):
+        """
+        Returns a generator of ``(rowx, colx, formula, value)`` tuples for
+        the cells in this sheet that carry a formula, in row-major order.
+        No :class:`Cell` objects are created.
+        """
+        cell_values = self._cell_values
+        for (rowx, colx), formula in sorted(self.formula_map.items()):
+            yield rowx, colx, formula, cell_values[rowx][colx]
+
     def __getitem__(self, item):
         """
         Takes either rowindex or (rowindex, colindex) as an index,
@@ -707,6 +734,11 @@ class Sheet(BaseObject):
                 self.nrows = nr
 
             self.used_cells.add((rowx, colx))
+            if formula:
+                self.formula_map[(rowx, colx)] = formula
+            else:
+                # the cell may replace an earlier formula cell
+                self.formula_map.pop((rowx, colx), None)
             types_row = self._cell_types[rowx]
             values_row = self._cell_values[rowx]
             formulas_row = self._cell_formulas[rowx]
@@ -754,6 +786,11 @@ class Sheet(BaseObject):
         # assert 0 <= rowx < self.utter_max_rows
         try:
             self.used_cells.add((rowx,colx))
+            if formula:
+                self.formula_map[(rowx, colx)] = formula
+            else:
+                # the cell may replace an earlier formula cell
+                self.formula_map.pop((rowx, colx), None)
             self._cell_types[rowx][colx] = ctype
             self._cell_values[rowx][colx] = value
             self._cell_formulas[rowx][colx] = formula
@@ -2363,7 +2400,7 @@ class Cell(BaseObject):
         </table>
     """
 
-    __slots__ = ['ctype', 'value', 'xf_index']
+    __slots__ = ['row', 'column', 'ctype', 'value', 'formula', 'xf_index']
 
     def __init__(self, row, column, ctype, value, formula= None, xf_index=None):
         self.row = row